@@ -3,9 +3,15 @@ ADK Chat Integration - FastAPI
 """
 
 import os
+import json
+import logging
 import time
-from typing import List, Dict, Any, Optional
+import hashlib
+import uuid
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from .database import get_db
@@ -13,27 +19,63 @@ from .models import User, Message, Chat
 from .adk_geospatial_agents.main_agent.agent import process_user_message
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.invocation_context import InvocationContext
-from collections import defaultdict
 
-# Global user state management (should be stored in Redis or DB in practice)
-user_states = defaultdict(lambda: {
-    "status": "idle",
-    "analysis_type": None,
-    "collected_params": {},
-    "conversation_context": []
-})
+logger = logging.getLogger(__name__)
+
+# Requests currently being processed by this worker, keyed by request hash
+_inflight_requests: Dict[str, asyncio.Future] = {}
+
+# Optional Redis for duplicate detection shared across workers
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = None
+# Errors from redis_client that only disable cross-worker dedupe, never the chat itself
+_REDIS_ERRORS: Tuple[type, ...] = ()
+if REDIS_URL:
+    # Only a dependency when cross-worker dedupe is configured
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    _REDIS_ERRORS = (RedisError,)
+DEDUPE_TTL_SECONDS = 60
+DEDUPE_POLL_INTERVAL = 0.2
+
+# Caps concurrent agent calls per worker; excess requests queue instead of piling up
+ADK_CONCURRENCY = int(os.getenv("ADK_CONCURRENCY", "8"))
+_adk_semaphore = asyncio.Semaphore(ADK_CONCURRENCY)
+
+# Session service and agent hold no per-request data, so one pair is shared;
+# Session/InvocationContext/CallbackContext are built per request
+_adk_shared: Optional[Tuple[Any, Any]] = None
 
 # ADK agents are called directly through the process_user_message function
 
-def create_adk_context(user_id: int, chat_id: int):
-    """Create CallbackContext according to ADK standards"""
+def _get_adk_shared() -> Tuple[Any, Any]:
+    """Return the shared (session_service, agent), building them on first use"""
+    global _adk_shared
+    if _adk_shared is None:
+        from google.adk.agents import Agent
+        from google.adk.sessions import InMemorySessionService
+        _adk_shared = (InMemorySessionService(), Agent(name="main_agent"))
+    return _adk_shared
+
+class MockCallbackContext:
+    """Fallback context when the ADK modules can't be used"""
+    def __init__(self, user_id, chat_id, is_new_chat=False):
+        self.state = {
+            "current_user_id": user_id,
+            "chat_id": chat_id,
+            "is_new_chat": is_new_chat
+        }
+
+def create_adk_context(user_id: int, chat_id: int, is_new_chat: bool = False):
+    """Create CallbackContext for one request according to ADK standards"""
     try:
         # Create InvocationContext according to ADK standards
         from google.adk.sessions import Session
-        from google.adk.agents import Agent
-        from google.adk.sessions import InMemorySessionService
         
-        # Create Session
+        session_service, agent = _get_adk_shared()
+        
+        # Fresh session per request so concurrent requests in a chat don't share state
         session = Session(
             id=f"session_{user_id}_{chat_id}",
             app_name="dataground",
@@ -43,16 +85,10 @@ def create_adk_context(user_id: int, chat_id: int):
             last_update_time=time.time()
         )
         
-        # Create SessionService
-        session_service = InMemorySessionService()
-        
-        # Create Agent
-        agent = Agent(name="main_agent")
-        
         # Create InvocationContext
         invocation_context = InvocationContext(
             session_service=session_service,
-            invocation_id=f"inv_{user_id}_{chat_id}_{int(time.time())}",
+            invocation_id=f"inv_{user_id}_{chat_id}_{uuid.uuid4().hex}",
             agent=agent,
             session=session
         )
@@ -61,136 +97,223 @@ def create_adk_context(user_id: int, chat_id: int):
         callback_context = CallbackContext(invocation_context)
         
         # Initialize state
-        if "user_states" not in callback_context.state:
-            callback_context.state["user_states"] = user_states
-        if "current_user_id" not in callback_context.state:
-            callback_context.state["current_user_id"] = user_id
-        if "chat_id" not in callback_context.state:
-            callback_context.state["chat_id"] = chat_id
-            
+        callback_context.state["current_user_id"] = user_id
+        callback_context.state["chat_id"] = chat_id
+        callback_context.state["is_new_chat"] = is_new_chat
+        
         return callback_context
         
     except ImportError as e:
-        print(f"⚠️ [ADK] ADK modules not available, using fallback: {e}")
-        # Fallback: Simple MockCallbackContext
-        class MockCallbackContext:
-            def __init__(self, user_id, chat_id):
-                self.state = {
-                    "user_states": user_states,
-                    "current_user_id": user_id,
-                    "chat_id": chat_id
-                }
-        return MockCallbackContext(user_id, chat_id)
-    except Exception as e:
-        print(f"❌ [ADK] Error creating ADK context: {e}")
-        # Fallback: Simple MockCallbackContext
-        class MockCallbackContext:
-            def __init__(self, user_id, chat_id):
-                self.state = {
-                    "user_states": user_states,
-                    "current_user_id": user_id,
-                    "chat_id": chat_id
-                }
-        return MockCallbackContext(user_id, chat_id)
+        logger.warning("ADK modules not available, using fallback: %s", e)
+        return MockCallbackContext(user_id, chat_id, is_new_chat)
+    except Exception:
+        logger.exception("Error creating ADK context")
+        return MockCallbackContext(user_id, chat_id, is_new_chat)
 
 async def send_message(message: str, user_id: int, db: Session, chat_id: int = None) -> Dict[str, Any]:
     """Process messages using ADK agents"""
-    import time
-    request_id = f"{int(time.time() * 1000)}_{user_id}_{message[:10]}"
-    print(f"🔍 [ADK_CHAT] {request_id} - Starting send_message function")
-    print(f"🔍 [ADK_CHAT] {request_id} - Message: {message[:20]}, User: {user_id}, Chat: {chat_id}")
+    # Coalesce duplicate requests: identical in-flight requests share the first one's result
+    request_hash = hashlib.blake2b(f"{user_id}|{chat_id}|{message}".encode(), digest_size=8).hexdigest()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "adk_chat request: req_id=%d_%s user=%s chat=%s hash=%s msg_prefix=%r",
+            int(time.time() * 1000), user_id, user_id, chat_id, request_hash, message[:20]
+        )
+    
+    inflight = _inflight_requests.get(request_hash)
+    if inflight is not None:
+        logger.info("Duplicate request detected, waiting for in-flight result: %s", request_hash)
+        response = await asyncio.shield(inflight)
+        return _coalesced_reply(response)
     
+    future = asyncio.get_running_loop().create_future()
+    _inflight_requests[request_hash] = future
     try:
-        print(f"🚀 [ADK Chat] Processing message from user {user_id}: '{message[:50]}...'")
-        
-        # Simple check to prevent duplicate requests
-        import hashlib
-        import time
-        request_hash = hashlib.md5(f"{user_id}_{chat_id}_{message}_{int(time.time())}".encode()).hexdigest()
-        print(f"🔍 [ADK_CHAT] {request_id} - Request hash: {request_hash}")
-        print(f"🔍 [ADK_CHAT] {request_id} - Current processing requests: {getattr(send_message, '_processing_requests', set())}")
-        
-        if hasattr(send_message, '_processing_requests'):
-            if request_hash in send_message._processing_requests:
-                print(f"⚠️ [ADK Chat] Duplicate request detected, ignoring: {request_hash}")
-                return {"message": "요청이 이미 처리 중입니다.", "status": "duplicate"}
-            send_message._processing_requests.add(request_hash)
+        if redis_client is not None:
+            response = await _process_message_shared(request_hash, message, user_id, db, chat_id)
         else:
-            send_message._processing_requests = {request_hash}
-        print(f"✅ [ADK_CHAT] {request_id} - Request added to processing set")
-        
+            response = await _process_message(message, user_id, db, chat_id)
+        future.set_result(response)
+        return response
+    except Exception as e:
+        future.set_exception(e)
+        # Mark as retrieved so an unawaited future doesn't log the error a second time
+        future.exception()
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        del _inflight_requests[request_hash]
+
+def _coalesced_reply(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Reply for a duplicate request: the original's message and status, without its side effects"""
+    # Dashboard updates (e.g. auto-executed analyses) and redirects already went out
+    # with the original reply and must not fire twice
+    return {
+        **response,
+        "deduped": True,
+        "dashboard_updated": False,
+        "dashboard_updates": [],
+        "redirect_to_manual": False
+    }
+
+# Deletes the dedupe lock only if it still holds this request's token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+def _result_key(request_hash: str, token: str) -> str:
+    """Redis key for the response published by the lock holder with this token"""
+    return f"dedupe_result:{request_hash}:{token}"
+
+async def _claim_shared_lock(lock_key: str, token: str) -> Optional[str]:
+    """Try to take the dedupe lock; returns the token of whoever holds it, or None if nobody could be found"""
+    for _ in range(2):
+        if await redis_client.set(lock_key, token, nx=True, ex=DEDUPE_TTL_SECONDS):
+            return token
+        owner_token = await redis_client.get(lock_key)
+        if owner_token is not None:
+            return owner_token
+        # The holder released the lock between our SET and GET; try to take it again
+    return None
+
+async def _process_message_shared(request_hash: str, message: str, user_id: int, db: Session, chat_id: Optional[int]) -> Dict[str, Any]:
+    """Dedupe across workers through Redis before running the agent
+    
+    Redis is best-effort here: if it fails, or the other worker never publishes a
+    result, the request is answered by this worker as if Redis weren't configured.
+    """
+    lock_key = f"dedupe:{request_hash}"
+    # Results are keyed by the lock holder's token, so a waiter can never pick up
+    # the response of an earlier, already finished identical request
+    token = uuid.uuid4().hex
+    
+    try:
+        owner_token = await _claim_shared_lock(lock_key, token)
+    except _REDIS_ERRORS:
+        logger.warning("Redis unavailable, skipping cross-worker dedupe: %s", request_hash, exc_info=True)
+        owner_token = None
+    
+    if owner_token is None:
+        return await _process_message(message, user_id, db, chat_id)
+    
+    if owner_token != token:
+        logger.info("Duplicate request in another worker, waiting for result: %s", request_hash)
+        response = await _wait_for_shared_result(lock_key, _result_key(request_hash, owner_token))
+        if response is not None:
+            return response
+        logger.info("No shared result for %s, processing it here", request_hash)
+        return await _process_message(message, user_id, db, chat_id)
+    
+    try:
+        response = await _process_message(message, user_id, db, chat_id)
+        try:
+            await redis_client.set(_result_key(request_hash, token), json.dumps(response, default=str), ex=DEDUPE_TTL_SECONDS)
+        except _REDIS_ERRORS:
+            logger.warning("Could not publish shared result: %s", request_hash, exc_info=True)
+        return response
+    finally:
+        try:
+            await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except _REDIS_ERRORS:
+            # The lock expires on its own after DEDUPE_TTL_SECONDS
+            logger.warning("Could not release dedupe lock: %s", request_hash, exc_info=True)
+
+async def _wait_for_shared_result(lock_key: str, result_key: str) -> Optional[Dict[str, Any]]:
+    """Poll Redis until the worker holding the dedupe lock publishes its response
+    
+    Returns None if the holder finished without a result, the wait times out or Redis fails.
+    """
+    deadline = time.monotonic() + DEDUPE_TTL_SECONDS
+    try:
+        while time.monotonic() < deadline:
+            cached = await redis_client.get(result_key)
+            if cached is not None:
+                return _coalesced_reply(json.loads(cached))
+            if not await redis_client.exists(lock_key):
+                # The holder released the lock; look once more in case it published just before
+                cached = await redis_client.get(result_key)
+                if cached is not None:
+                    return _coalesced_reply(json.loads(cached))
+                # The other worker failed without publishing a result
+                return None
+            await asyncio.sleep(DEDUPE_POLL_INTERVAL)
+    except _REDIS_ERRORS:
+        logger.warning("Redis failed while waiting for %s", result_key, exc_info=True)
+    return None
+
+def _save_message(db: Session, message: Message) -> Message:
+    """Persist a message (blocking, so callers run it in the threadpool)"""
+    db.add(message)
+    db.commit()
+    db.refresh(message)
+    return message
+
+async def _process_message(message: str, user_id: int, db: Session, chat_id: Optional[int]) -> Dict[str, Any]:
+    """Run the ADK agent for a single (non-duplicate) request"""
+    try:
         # Use user's recent chat if chat_id is not provided
         if not chat_id:
-            user_chats = db.query(Chat).filter(Chat.user_id == user_id).order_by(Chat.created_at.desc()).limit(1).all()
-            if not user_chats:
+            latest_chat = await run_in_threadpool(
+                lambda: db.query(Chat).filter(Chat.user_id == user_id).order_by(Chat.created_at.desc()).first()
+            )
+            if latest_chat is None:
                 raise HTTPException(status_code=404, detail="No chat found for user")
-            chat_id = user_chats[0].id
-        
-        # Check if this is a new chat (excluding current message from count)
-        # Count user messages excluding current message (to check if new chat)
-        user_message_count = db.query(Message).filter(
-            Message.chat_id == chat_id,
-            Message.sender == "user",
-            Message.content != message  # Exclude current message
-        ).count()
-        
-        is_new_chat = user_message_count == 0  # New chat if no user messages excluding current message
-        print(f"🔍 [ADK Chat] User message count (excluding current): {user_message_count}")
-        print(f"🔍 [ADK Chat] is_new_chat: {is_new_chat}")
+            chat_id = latest_chat.id
+        
+        # Check if this is a new chat: no user messages other than the current one
+        # (EXISTS stops at the first matching row instead of counting them all)
+        has_previous_user_message = await run_in_threadpool(
+            lambda: db.query(
+                db.query(Message).filter(
+                    Message.chat_id == chat_id,
+                    Message.sender == "user",
+                    Message.content != message  # Exclude current message
+                ).exists()
+            ).scalar()
+        )
         
-        # Debug: Check all messages in current chat
-        all_messages = db.query(Message).filter(Message.chat_id == chat_id).order_by(Message.created_at).all()
-        print(f"🔍 [ADK Chat] All messages in chat {chat_id}:")
-        for msg in all_messages:
-            print(f"  - {msg.sender}: {msg.content[:20]}...")
+        is_new_chat = not has_previous_user_message
         
         # User message is already saved in send_message_endpoint
         # Only need to generate AI response here
-        print(f"✅ [ADK Chat] Processing AI response for chat {chat_id}")
-        
-        # Create ADK standard CallbackContext
-        callback_context = create_adk_context(user_id, chat_id)
-        
-        # Add new chat information to callback_context
-        callback_context.state["is_new_chat"] = is_new_chat
-        print(f"🔍 [ADK Chat] Set is_new_chat in callback_context: {is_new_chat}")
+        # Get ADK standard CallbackContext with new chat information
+        callback_context = create_adk_context(user_id, chat_id, is_new_chat=is_new_chat)
         
         # Call ADK agent
-        response = await process_user_message(message, user_id, callback_context)
+        async with _adk_semaphore:
+            response = await process_user_message(message, user_id, callback_context)
         
         # Get response message content (saving is handled in send_message_endpoint)
         response_content = response.get("message", "Sorry, I cannot generate a response.")
-        
-        print(f"✅ [ADK Chat] Response generated: '{response_content[:50]}...'")
-        
+        status = response.get("status", "completed")
+        dashboard_updated = response.get("dashboard_updated", False)
         dashboard_updates = response.get("dashboard_updates", [])
-        print(f"🔍 [ADK Chat] Dashboard updates in response: {len(dashboard_updates)} items")
-        print(f"🔍 [ADK Chat] Dashboard updates content: {dashboard_updates}")
-        
-        # Debug ADK response
-        print(f"🔍 [ADK Chat] Full ADK response keys: {list(response.keys())}")
-        print(f"🔍 [ADK Chat] redirect_to_manual: {response.get('redirect_to_manual', 'NOT_FOUND')}")
-        print(f"🔍 [ADK Chat] manual_analysis_params: {response.get('manual_analysis_params', 'NOT_FOUND')}")
-        print(f"🔍 [ADK Chat] analysis_type: {response.get('analysis_type', 'NOT_FOUND')}")
+        redirect_to_manual = response.get("redirect_to_manual", False)
+        manual_analysis_params = response.get("manual_analysis_params")
+        analysis_type = response.get("analysis_type")
         
-        # Remove request hash
-        if hasattr(send_message, '_processing_requests') and request_hash in send_message._processing_requests:
-            send_message._processing_requests.remove(request_hash)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "adk_chat response: user=%s chat=%s is_new_chat=%s keys=%s dashboard_updates=%d analysis_type=%s",
+                user_id, chat_id, is_new_chat, list(response.keys()), len(dashboard_updates), analysis_type
+            )
         
         return {
             "message": response_content,
-            "status": response.get("status", "completed"),
-            "dashboard_updated": response.get("dashboard_updated", False),
+            "status": status,
+            "dashboard_updated": dashboard_updated,
             "dashboard_updates": dashboard_updates,
-            "redirect_to_manual": response.get("redirect_to_manual", False),
-            "manual_analysis_params": response.get("manual_analysis_params", None),
-            "analysis_type": response.get("analysis_type", None)
+            "redirect_to_manual": redirect_to_manual,
+            "manual_analysis_params": manual_analysis_params,
+            "analysis_type": analysis_type
         }
         
     except Exception as e:
-        print(f"❌ [ADK Chat] Error processing message: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error processing message for user %s", user_id)
         
         # Save error message
         error_message = f"Sorry, an error occurred: {str(e)}"
@@ -199,8 +322,7 @@ async def send_message(message: str, user_id: int, db: Session, chat_id: int = N
             sender="assistant",
             content=error_message
         )
-        db.add(db_error)
-        db.commit()
+        await run_in_threadpool(_save_message, db, db_error)
         
         raise HTTPException(status_code=500, detail=error_message)
 
@@ -208,19 +330,22 @@ async def generate_ai_response(user_id: int, db: Session) -> Dict[str, Any]:
     """Generate AI response (maintain existing compatibility)"""
     try:
         # Get user's recent chat
-        user_chats = db.query(Chat).filter(Chat.user_id == user_id).order_by(Chat.created_at.desc()).limit(1).all()
+        latest_chat = await run_in_threadpool(
+            lambda: db.query(Chat).filter(Chat.user_id == user_id).order_by(Chat.created_at.desc()).first()
+        )
         
-        if not user_chats:
+        if latest_chat is None:
             return {
                 "message": "Hello! I'm the DataGround geospatial analysis system. How can I help you with your analysis?",
                 "status": "greeting"
             }
         
         # Get messages from the most recent chat
-        latest_chat = user_chats[0]
-        chat_history = db.query(Message).filter(
-            Message.chat_id == latest_chat.id
-        ).order_by(Message.created_at.desc()).limit(10).all()
+        chat_history = await run_in_threadpool(
+            lambda: db.query(Message).filter(
+                Message.chat_id == latest_chat.id
+            ).order_by(Message.created_at.desc()).limit(10).all()
+        )
         
         if not chat_history:
             return {
@@ -245,7 +370,8 @@ async def generate_ai_response(user_id: int, db: Session) -> Dict[str, Any]:
         callback_context = create_adk_context(user_id, latest_chat.id)
         
         # Call ADK agent
-        response = await process_user_message(latest_user_message.content, user_id, callback_context)
+        async with _adk_semaphore:
+            response = await process_user_message(latest_user_message.content, user_id, callback_context)
         
         # Save AI message
         ai_message = Message(
@@ -253,9 +379,7 @@ async def generate_ai_response(user_id: int, db: Session) -> Dict[str, Any]:
             sender="assistant",
             content=response["message"]
         )
-        db.add(ai_message)
-        db.commit()
-        db.refresh(ai_message)
+        await run_in_threadpool(_save_message, db, ai_message)
         
         return {
             "message": response["message"],
@@ -267,9 +391,7 @@ async def generate_ai_response(user_id: int, db: Session) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"❌ [ADK Chat] Error generating AI response: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error generating AI response")
         
         return {
             "message": f"Sorry, an error occurred: {str(e)}",
@@ -279,12 +401,11 @@ async def generate_ai_response(user_id: int, db: Session) -> Dict[str, Any]:
 def get_chat_history(user_id: int, db: Session, limit: int = 50) -> List[Dict[str, Any]]:
     """Get chat history"""
     try:
-        # Get messages from all user chats
-        user_chats = db.query(Chat).filter(Chat.user_id == user_id).all()
-        chat_ids = [chat.id for chat in user_chats]
-        
-        messages = db.query(Message).filter(
-            Message.chat_id.in_(chat_ids)
+        # Get messages from all user chats in a single joined query
+        messages = db.query(Message).join(
+            Chat, Chat.id == Message.chat_id
+        ).filter(
+            Chat.user_id == user_id
         ).order_by(Message.created_at.desc()).limit(limit).all()
         
         return [
@@ -298,5 +419,5 @@ def get_chat_history(user_id: int, db: Session, limit: int = 50) -> List[Dict[st
         ]
         
     except Exception as e:
-        print(f"❌ [ADK Chat] Error getting chat history: {str(e)}")
+        logger.exception("Error getting chat history")
         return []
@@ -3,10 +3,17 @@ Main Coordinator Agent - ADK Standard
 """
 
 import os
+import re
+import time
 import asyncio
+import logging
 from datetime import date
-from typing import Dict, Any, Optional
-from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import httpx
+import orjson
 
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
@@ -25,20 +32,29 @@ from .tools import (
 from ..shared.utils.parameter_collector import parameter_collector
 from ..shared.utils.bbox_utils import calculate_bbox, get_standard_buffer
 from ..shared.utils.command_system import command_parser, command_executor
+from ..shared.utils.user_state import UserState, get_user_state
+
+logger = logging.getLogger(__name__)
 
 date_today = date.today()
 
+# Confirmation replies: English words must stand alone (so "y" doesn't match "city"),
+# Korean stems keep substring matching since endings attach to them (e.g. 네요, 맞아요)
+POSITIVE_RESPONSE_RE = re.compile(r"\b(?:yes|y|ok|okay)\b|응|그래|맞아|맞다|맞습니다|네|좋아", re.IGNORECASE)
+NEGATIVE_RESPONSE_RE = re.compile(r"\b(?:no|n)\b|아니|아니다|아니요|아닙니다|틀렸|다시|취소", re.IGNORECASE)
+
+# General conversation replies; handed out as copies so callers can't alter the originals
+_WELCOME_RESPONSE = {
+    "message": "Hello! I'm the DataGround geospatial analysis system. How can I help you with your analysis?\n\nSupported analyses:\n- Sea level rise risk analysis\n- Urban area analysis\n- Infrastructure exposure analysis\n- Topic modeling analysis",
+    "status": "general_chat"
+}
+_HELP_RESPONSE = {
+    "message": "Hello! How can I help you today? I can assist you with:\n\n• Sea level rise risk analysis\n• Urban area analysis\n• Infrastructure exposure analysis\n• Topic modeling analysis\n\nJust let me know what you'd like to analyze!",
+    "status": "general_chat"
+}
+
 def setup_before_agent_call(callback_context: CallbackContext):
     """Setup before agent call"""
-    # Initialize user-specific state
-    if "user_states" not in callback_context.state:
-        callback_context.state["user_states"] = defaultdict(lambda: {
-            "status": "idle",  # idle, collecting_parameters, awaiting_confirmation, analysis_in_progress
-            "analysis_type": None,
-            "collected_params": {},
-            "conversation_context": []
-        })
-    
     # Set current user ID (should be retrieved from request in practice)
     if "current_user_id" not in callback_context.state:
         callback_context.state["current_user_id"] = 1  # Default value
@@ -48,22 +64,18 @@ async def process_user_message(message: str, user_id: int, callback_context: Cal
     # Setup before ADK agent call
     setup_before_agent_call(callback_context)
     
-    user_states = callback_context.state["user_states"]
-    user_state = user_states[user_id]
+    user_state = get_user_state(user_id)
     
-    print(f"🚀 [Main Agent] Processing message from user {user_id}: '{message[:50]}...'")
+    logger.debug("Processing message from user %s: '%s...'", user_id, message[:50])
     
     # 1. Check for commands first (highest priority)
     command = command_parser.parse_command(message)
     if command:
-        print(f"🔧 [Main Agent] Command detected: {command.type}")
+        logger.debug("Command detected: %s", command.type)
         result = await command_executor.execute_command(command, user_id, callback_context)
         
         # Add AI response to conversation context
-        if "conversation_context" not in user_state:
-            user_state["conversation_context"] = []
-        
-        user_state["conversation_context"].append({
+        user_state.conversation_context.append({
             "role": "assistant",
             "content": result.get("message", ""),
             "timestamp": "now"
@@ -74,101 +86,82 @@ async def process_user_message(message: str, user_id: int, callback_context: Cal
     # Check if new chat and initialize state
     is_new_chat = callback_context.state.get("is_new_chat", False)
     if is_new_chat:
-        print(f"🔄 [Main Agent] New chat detected, resetting user state")
-        user_state["status"] = "idle"
-        user_state["analysis_type"] = None
-        user_state["collected_params"] = {}
-        user_state["conversation_context"] = []
+        logger.debug("New chat detected, resetting user state")
+        user_state.status = "idle"
+        user_state.analysis_type = None
+        user_state.collected_params = {}
+        user_state.conversation_context.clear()
     
     # Add user message to conversation context
-    if "conversation_context" not in user_state:
-        user_state["conversation_context"] = []
-    
-    user_state["conversation_context"].append({
+    user_state.conversation_context.append({
         "role": "user",
         "content": message,
         "timestamp": "now"
     })
     
     # Process by status
-    if user_state["status"] == "collecting_parameters":
+    if user_state.status == "collecting_parameters":
         return await handle_parameter_collection(message, user_id, user_state, callback_context)
-    elif user_state["status"] == "awaiting_confirmation":
+    elif user_state.status == "awaiting_confirmation":
         return await handle_confirmation(message, user_id, user_state, callback_context)
     else:
         return await handle_new_request(message, user_id, user_state, callback_context)
 
-async def handle_new_request(message: str, user_id: int, user_state: Dict[str, Any], callback_context: CallbackContext) -> Dict[str, Any]:
+async def handle_new_request(message: str, user_id: int, user_state: UserState, callback_context: CallbackContext) -> Dict[str, Any]:
     """Handle new request"""
-    print(f"🔍 [Main Agent] Analyzing new request...")
+    logger.debug("Analyzing new request...")
     
     # Detect analysis intent
     try:
         intent_result = await detect_analysis_intent(message, callback_context)
-        print(f"🔍 [Main Agent] Intent detection result: {intent_result}")
+        logger.debug("Intent detection result: %s", intent_result)
         analysis_type = intent_result.get("intent")
         
-        print(f"🔍 [Main Agent] analysis_type value: '{analysis_type}' (type: {type(analysis_type)})")
-        print(f"🔍 [Main Agent] analysis_type is truthy: {bool(analysis_type)}")
-        
         if analysis_type:
-            print(f"📊 [Main Agent] Detected analysis type: {analysis_type}")
-            print(f"📊 [Main Agent] Entering analysis setup block...")
+            logger.debug("Detected analysis type: %s", analysis_type)
         else:
-            print(f"❌ [Main Agent] No analysis intent detected")
-    except Exception as e:
-        print(f"❌ [Main Agent] Intent detection error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+            logger.debug("No analysis intent detected")
+    except Exception:
+        logger.exception("Intent detection error")
         analysis_type = None
     
     # Only proceed with parameter collection if analysis_type exists
     if analysis_type:
-        print(f"🔧 [Main Agent] Setting up parameter collection for {analysis_type}...")
+        logger.debug("Setting up parameter collection for %s...", analysis_type)
         
         # Start parameter collection
-        user_state["status"] = "collecting_parameters"
-        user_state["analysis_type"] = analysis_type
-        user_state["collected_params"] = {}
+        user_state.status = "collecting_parameters"
+        user_state.analysis_type = analysis_type
+        user_state.collected_params = {}
         
-        print(f"🔧 [Main Agent] User state updated: {user_state}")
+        logger.debug("User state updated: %s", user_state)
         
         # Collect parameters
         try:
-            print(f"🔧 [Main Agent] Starting parameter collection...")
+            logger.debug("Starting parameter collection...")
             param_result = await parameter_collector.collect_parameters(
-                message, analysis_type, user_state["collected_params"]
+                message, analysis_type, user_state.collected_params
             )
-            print(f"🔧 [Main Agent] Parameter collection result: {param_result}")
-        except Exception as e:
-            print(f"❌ [Main Agent] Parameter collection error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.debug("Parameter collection result: %s", param_result)
+        except Exception:
+            logger.exception("Parameter collection error")
             return {
                 "message": "An error occurred during parameter collection. Please try again.",
                 "status": "error"
             }
         
-        if param_result["needs_more_info"]:
-            print(f"🔧 [Main Agent] More information needed, generating question...")
-            missing_params = param_result["validation"]["missing"]
-            print(f"🔧 [Main Agent] Missing params: {missing_params}")
+        if param_result.needs_more_info:
+            logger.debug("More information needed, generating question...")
+            missing_params = param_result.validation.missing
+            logger.debug("Missing params: %s", missing_params)
             
-            # Change order to ask Country first, then City
-            if "country_name" in missing_params:
-                question = "Which country would you like to analyze? (e.g., South Korea, United States)"
-            elif "city_name" in missing_params:
-                question = "Which city would you like to analyze? (e.g., Seoul, Busan, New York)"
-            else:
-                # Ask only the first missing parameter
-                first_missing = missing_params[0]
-                question = parameter_collector.generate_questions([first_missing], analysis_type)
+            question = _next_question(missing_params, analysis_type)
             
             response_message = f"Yes, I'll help you with {analysis_type.replace('_', ' ')} analysis! {question}"
-            print(f"🔧 [Main Agent] Generated response: {response_message}")
+            logger.debug("Generated response: %s", response_message)
             
             # Add AI response to conversation context
-            user_state["conversation_context"].append({
+            user_state.conversation_context.append({
                 "role": "assistant",
                 "content": response_message,
                 "timestamp": "now"
@@ -181,60 +174,86 @@ async def handle_new_request(message: str, user_id: int, user_state: Dict[str, A
                 "needs_clarification": True
             }
         else:
-            print(f"🔧 [Main Agent] All parameters collected, executing analysis...")
+            logger.debug("All parameters collected, executing analysis...")
             # All parameters collected - execute analysis
-            return await execute_analysis(analysis_type, param_result["params"], user_id, user_state, callback_context)
+            return await execute_analysis(analysis_type, param_result.params, user_id, user_state, callback_context)
     else:
         # General conversation - show welcome message only for new chats
         is_new_chat = callback_context.state.get("is_new_chat", False)
-        print(f"🔍 [Main Agent] is_new_chat: {is_new_chat}")
+        logger.debug("is_new_chat: %s", is_new_chat)
         
         if is_new_chat:
-            print(f"🔍 [Main Agent] Showing welcome message for new chat")
-            return {
-                "message": "Hello! I'm the DataGround geospatial analysis system. How can I help you with your analysis?\n\nSupported analyses:\n- Sea level rise risk analysis\n- Urban area analysis\n- Infrastructure exposure analysis\n- Topic modeling analysis",
-                "status": "general_chat"
-            }
+            logger.debug("Showing welcome message for new chat")
+            return dict(_WELCOME_RESPONSE)
         else:
-            print(f"🔍 [Main Agent] Showing generic response for existing chat")
+            logger.debug("Showing generic response for existing chat")
             # Friendly response for general conversation
-            return {
-                "message": "Hello! How can I help you today? I can assist you with:\n\n• Sea level rise risk analysis\n• Urban area analysis\n• Infrastructure exposure analysis\n• Topic modeling analysis\n\nJust let me know what you'd like to analyze!",
-                "status": "general_chat"
-            }
+            return dict(_HELP_RESPONSE)
+
+# Location questions are asked first, Country before City
+_CANNED_QUESTIONS = {
+    "country_name": "Which country would you like to analyze? (e.g., South Korea, United States)",
+    "city_name": "Which city would you like to analyze? (e.g., Seoul, Busan, New York)",
+}
+_QUESTION_PRIORITY = ("country_name", "city_name")
+
+def _next_question(missing_params: List[str], analysis_type: str) -> str:
+    """Question for the next missing parameter (asks one parameter at a time)"""
+    for param in _QUESTION_PRIORITY:
+        if param in missing_params:
+            return _CANNED_QUESTIONS[param]
+    return parameter_collector.generate_questions([missing_params[0]], analysis_type)
+
+def _format_confirmation(analysis_type: str, collected: Dict[str, Any]) -> str:
+    """Build the confirmation message listing the collected parameters"""
+    lines = [
+        "Thank you! I've received the following information:",
+        f"Country: {collected.get('country_name', 'None')}",
+        f"City: {collected.get('city_name', 'None')}"
+    ]
+    
+    # Display different information by analysis type
+    if analysis_type == "urban_analysis":
+        lines.append(f"Start Year: {collected.get('start_year', 'None')}")
+        lines.append(f"End Year: {collected.get('end_year', 'None')}")
+    else:
+        lines.append(f"Year: {collected.get('year', 'None')}")
+    
+    threshold = collected.get("threshold", "None")
+    lines.append(f"Sea-level: {threshold}m" if threshold != "None" else "Sea-level: None")
+    return "\n".join(lines)
 
-async def handle_parameter_collection(message: str, user_id: int, user_state: Dict[str, Any], callback_context: CallbackContext) -> Dict[str, Any]:
+async def handle_parameter_collection(message: str, user_id: int, user_state: UserState, callback_context: CallbackContext) -> Dict[str, Any]:
     """Handle parameter collection"""
-    print(f"🔧 [Main Agent] Collecting parameters for {user_state['analysis_type']}...")
+    logger.debug("Collecting parameters for %s...", user_state.analysis_type)
     
-    analysis_type = user_state["analysis_type"]
-    existing_params = user_state["collected_params"]
+    analysis_type = user_state.analysis_type
+    existing_params = user_state.collected_params
     
     # Collect parameters
     try:
         param_result = await parameter_collector.collect_parameters(
             message, analysis_type, existing_params
         )
-        print(f"🔧 [Main Agent] Parameter collection result: {param_result}")
-    except Exception as e:
-        print(f"❌ [Main Agent] Parameter collection error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Parameter collection result: %s", param_result)
+    except Exception:
+        logger.exception("Parameter collection error")
         return {
             "message": "An error occurred during parameter collection. Please try again.",
             "status": "error"
         }
     
     # Update collected parameters
-    user_state["collected_params"] = param_result["params"]
+    params = param_result.params
+    user_state.collected_params = params
     
     # If there's an exact match, ignore suggestion message and continue
-    has_exact_match = any(key in param_result["params"] for key in ["city_name", "country_name"])
+    has_exact_match = "city_name" in params or "country_name" in params
     
     # Only process if there's a suggestion message and no exact match
-    if not has_exact_match and "suggestion_message" in param_result["params"]:
+    if not has_exact_match and "suggestion_message" in params:
         return {
-            "message": param_result["params"]["suggestion_message"],
+            "message": params["suggestion_message"],
             "analysis_type": analysis_type,
             "status": "collecting_parameters",
             "needs_clarification": True,
@@ -242,53 +261,19 @@ async def handle_parameter_collection(message: str, user_id: int, user_state: Di
         }
     
     # Generate confirmation message for collected information
-    collected = user_state["collected_params"]
-    country = collected.get("country_name", "None")
-    city = collected.get("city_name", "None") 
-    
-    confirmation_message = f"Thank you! I've received the following information:\n"
-    confirmation_message += f"Country: {country}\n"
-    confirmation_message += f"City: {city}\n"
-    
-    # Display different information by analysis type
-    if analysis_type == "urban_analysis":
-        start_year = collected.get("start_year", "None")
-        end_year = collected.get("end_year", "None")
-        threshold = collected.get("threshold", "None")
-        confirmation_message += f"Start Year: {start_year}\n"
-        confirmation_message += f"End Year: {end_year}\n"
-        if threshold != "None":
-            threshold = f"{threshold}m"
-        confirmation_message += f"Sea-level: {threshold}"
-    else:
-        year = collected.get("year", "None")
-        threshold = collected.get("threshold", "None")
-        confirmation_message += f"Year: {year}\n"
-        if threshold != "None":
-            threshold = f"{threshold}m"
-        confirmation_message += f"Sea-level: {threshold}"
+    confirmation_message = _format_confirmation(analysis_type, params)
     
     # Check if all parameters are collected
-    all_collected = parameter_collector.are_all_parameters_collected(
-        param_result["params"], analysis_type
-    )
+    all_collected = parameter_collector.are_all_parameters_collected(params, analysis_type)
     
-    print(f"🔍 [Main Agent] Parameter collection check: all_collected={all_collected}")
-    print(f"🔍 [Main Agent] Current params: {param_result['params']}")
-    print(f"🔍 [Main Agent] Validation result: {param_result['validation']}")
+    logger.debug("Parameter collection check: all_collected=%s", all_collected)
+    logger.debug("Current params: %s", params)
+    logger.debug("Validation result: %s", param_result.validation)
     
     if not all_collected:
         # Still missing parameters
-        missing_params = param_result["validation"]["missing"]
-        # Change order to ask Country first, then City
-        if "country_name" in missing_params:
-            question = "Which country would you like to analyze? (e.g., South Korea, United States)"
-        elif "city_name" in missing_params:
-            question = "Which city would you like to analyze? (e.g., Seoul, Busan, New York)"
-        else:
-            # Ask only the next missing parameter
-            next_missing = missing_params[0]
-            question = parameter_collector.generate_questions([next_missing], analysis_type)
+        missing_params = param_result.validation.missing
+        question = _next_question(missing_params, analysis_type)
         
         return {
             "message": f"{confirmation_message}\n\n{question}",
@@ -298,8 +283,8 @@ async def handle_parameter_collection(message: str, user_id: int, user_state: Di
         }
     else:
         # All parameters collected - request user confirmation
-        print(f"✅ [Main Agent] All parameters collected, requesting user confirmation...")
-        user_state["status"] = "awaiting_confirmation"  # Change to confirmation waiting state
+        logger.debug("All parameters collected, requesting user confirmation...")
+        user_state.status = "awaiting_confirmation"  # Change to confirmation waiting state
         
         return {
             "message": f"{confirmation_message}\n\nIs this information correct? (yes/no)",
@@ -308,31 +293,26 @@ async def handle_parameter_collection(message: str, user_id: int, user_state: Di
             "needs_clarification": True
         }
 
-async def handle_confirmation(message: str, user_id: int, user_state: Dict[str, Any], callback_context: CallbackContext) -> Dict[str, Any]:
+async def handle_confirmation(message: str, user_id: int, user_state: UserState, callback_context: CallbackContext) -> Dict[str, Any]:
     """Handle user confirmation"""
-    print(f"❓ [Main Agent] Handling user confirmation...")
-    
-    message_lower = message.lower().strip()
+    logger.debug("Handling user confirmation...")
     
     # Check for positive response
-    positive_responses = ['yes', 'y', '응', '그래', '맞아', '맞다', '맞습니다', '네', '좋아', 'ok', 'okay']
-    negative_responses = ['no', 'n', '아니', '아니다', '아니요', '아닙니다', '틀렸', '다시', '취소']
-    
-    if any(response in message_lower for response in positive_responses):
+    if POSITIVE_RESPONSE_RE.search(message):
         # User confirmed - execute analysis
-        print(f"✅ [Main Agent] User confirmed, executing analysis...")
-        user_state["status"] = "idle"  # Reset state
-        analysis_type = user_state["analysis_type"]
-        collected_params = user_state["collected_params"]
+        logger.debug("User confirmed, executing analysis...")
+        user_state.status = "idle"  # Reset state
+        analysis_type = user_state.analysis_type
+        collected_params = user_state.collected_params
         return await execute_analysis(analysis_type, collected_params, user_id, user_state, callback_context)
     
-    elif any(response in message_lower for response in negative_responses):
+    elif NEGATIVE_RESPONSE_RE.search(message):
         # User rejected - start over from beginning
-        print(f"🔄 [Main Agent] User rejected, restarting parameter collection...")
-        user_state["status"] = "collecting_parameters"
-        user_state["collected_params"] = {}  # Reset collected parameters
+        logger.debug("User rejected, restarting parameter collection...")
+        user_state.status = "collecting_parameters"
+        user_state.collected_params = {}  # Reset collected parameters
         
-        analysis_type = user_state["analysis_type"]
+        analysis_type = user_state.analysis_type
         return {
             "message": f"Understood! I'll restart the {analysis_type.replace('_', ' ')} analysis. What year would you like to analyze? (2001-2020) (e.g., 2020, 2018)",
             "analysis_type": analysis_type,
@@ -342,43 +322,62 @@ async def handle_confirmation(message: str, user_id: int, user_state: Dict[str,
     
     else:
         # Unclear response - request confirmation again
-        collected = user_state["collected_params"]
-        country = collected.get("country_name", "None")
-        city = collected.get("city_name", "None")
-        analysis_type = user_state["analysis_type"]
-        
-        confirmation_message = f"Thank you! I've received the following information:\n"
-        confirmation_message += f"Country: {country}\n"
-        confirmation_message += f"City: {city}\n"
-        
-        # Display different information by analysis type
-        if analysis_type == "urban_analysis":
-            start_year = collected.get("start_year", "None")
-            end_year = collected.get("end_year", "None")
-            threshold = collected.get("threshold", "None")
-            confirmation_message += f"Start Year: {start_year}\n"
-            confirmation_message += f"End Year: {end_year}\n"
-            if threshold != "None":
-                threshold = f"{threshold}m"
-            confirmation_message += f"Sea-level: {threshold}"
-        else:
-            year = collected.get("year", "None")
-            threshold = collected.get("threshold", "None")
-            confirmation_message += f"Year: {year}\n"
-            if threshold != "None":
-                threshold = f"{threshold}m"
-            confirmation_message += f"Sea-level: {threshold}"
+        confirmation_message = _format_confirmation(user_state.analysis_type, user_state.collected_params)
         
         return {
             "message": f"{confirmation_message}\n\nIs this information correct? (yes/no)",
-            "analysis_type": user_state["analysis_type"],
+            "analysis_type": user_state.analysis_type,
             "status": "awaiting_confirmation",
             "needs_clarification": True
         }
 
-async def execute_analysis(analysis_type: str, params: Dict[str, Any], user_id: int, user_state: Dict[str, Any], callback_context: CallbackContext) -> Dict[str, Any]:
+@dataclass(frozen=True, slots=True)
+class AnalysisSpec:
+    """How an analysis type maps collected parameters to manual analysis URL parameters"""
+    display: str
+    year_keys: Tuple[str, ...]  # Parameters sent as year1 (and year2)
+    needs_threshold: bool
+    build_extra: Callable[[Dict[str, Any]], Dict[str, Any]] = lambda params: {}
+
+def _topic_modeling_extra(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Special parameters for topic_modeling"""
+    return {
+        "method": params.get("method", "lda"),
+        "nTopics": params.get("n_topics", 10),
+        "minDf": params.get("min_df", 2.0),
+        "maxDf": params.get("max_df", 0.95),
+        "ngramRange": params.get("ngram_range", "1,1"),
+        "inputType": params.get("input_type", "text"),
+        "textInput": params.get("text_input", ""),
+        "files": params.get("files", [])
+    }
+
+_ANALYSIS_SPECS = {
+    "sea_level_rise": AnalysisSpec("Sea Level Rise Risk Analysis", ("year",), True),
+    "urban_analysis": AnalysisSpec("Urban Area Analysis", ("start_year", "end_year"), True),
+    "infrastructure_analysis": AnalysisSpec("Infrastructure Exposure Analysis", ("year",), True),
+    "topic_modeling": AnalysisSpec("Topic Modeling Analysis", ("year",), False, _topic_modeling_extra)
+}
+
+# Analysis completion message
+_RESPONSE_TEMPLATE = (
+    "✅ **{analysis_name} has been automatically executed!**\n\n"
+    "📋 **Analysis Information:**\n"
+    "• Country: {country}\n"
+    "• City: {city}\n"
+    "• Year: {year}\n"
+    "• Threshold: {threshold}m\n\n"
+    "🔍 **Analysis results are displayed on the dashboard.**\n"
+    "💡 **Tip:** To modify parameters, you can re-analyze in the \"Map\" tab."
+)
+
+async def execute_analysis(analysis_type: str, params: Dict[str, Any], user_id: int, user_state: UserState, callback_context: CallbackContext) -> Dict[str, Any]:
     """Automatically execute analysis after parameter collection is complete"""
-    print(f"🚀 [Main Agent] Parameters collected for {analysis_type} analysis with params: {params}")
+    logger.debug("Parameters collected for %s analysis with params: %s", analysis_type, params)
+    
+    spec = _ANALYSIS_SPECS.get(analysis_type) or AnalysisSpec(
+        analysis_type.replace('_', ' ').title(), ("year",), False
+    )
     
     # Generate URL parameters to pass to manual analysis system
     # Include only necessary parameters for each analysis type
@@ -387,40 +386,13 @@ async def execute_analysis(analysis_type: str, params: Dict[str, Any], user_id:
         "country": params.get("country_name", ""),
         "city": params.get("city_name", ""),
     }
-    
-    # 연도 파라미터 설정
-    if analysis_type == "urban_analysis":
-        analysis_params["year1"] = params.get("start_year", "")
-        analysis_params["year2"] = params.get("end_year", "")
-    else:
-        analysis_params["year1"] = params.get("year", "")
-    
-    # Add threshold only for analysis types that require it
-    if analysis_type in ["sea_level_rise", "infrastructure_analysis", "urban_analysis"]:
+    for url_key, param_key in zip(("year1", "year2"), spec.year_keys):
+        analysis_params[url_key] = params.get(param_key, "")
+    if spec.needs_threshold:
         analysis_params["threshold"] = params.get("threshold", "")
+    analysis_params.update(spec.build_extra(params))
     
-    # Add special parameters for topic_modeling
-    if analysis_type == "topic_modeling":
-        analysis_params.update({
-            "method": params.get("method", "lda"),
-            "nTopics": params.get("n_topics", 10),
-            "minDf": params.get("min_df", 2.0),
-            "maxDf": params.get("max_df", 0.95),
-            "ngramRange": params.get("ngram_range", "1,1"),
-            "inputType": params.get("input_type", "text"),
-            "textInput": params.get("text_input", ""),
-            "files": params.get("files", [])
-        })
-    
-    # Analysis type messages
-    analysis_messages = {
-        "sea_level_rise": "Sea Level Rise Risk Analysis",
-        "urban_analysis": "Urban Area Analysis", 
-        "infrastructure_analysis": "Infrastructure Exposure Analysis",
-        "topic_modeling": "Topic Modeling Analysis"
-    }
-    
-    analysis_name = analysis_messages.get(analysis_type, analysis_type.replace('_', ' ').title())
+    analysis_name = spec.display
     
     # Create dashboard updates for automatic analysis execution
     dashboard_updates = [{
@@ -431,28 +403,25 @@ async def execute_analysis(analysis_type: str, params: Dict[str, Any], user_id:
     }]
     
     # Analysis completion message
-    response_message = f"""✅ **{analysis_name} has been automatically executed!**
-
-📋 **Analysis Information:**
-• Country: {params.get("country_name", "N/A")}
-• City: {params.get("city_name", "N/A")}
-• Year: {params.get("year", "N/A")}
-• Threshold: {params.get("threshold", "N/A")}m
-
-🔍 **Analysis results are displayed on the dashboard.**
-💡 **Tip:** To modify parameters, you can re-analyze in the "Map" tab."""
+    response_message = _RESPONSE_TEMPLATE.format_map({
+        "analysis_name": analysis_name,
+        "country": params.get("country_name", "N/A"),
+        "city": params.get("city_name", "N/A"),
+        "year": params.get("year", "N/A"),
+        "threshold": params.get("threshold", "N/A")
+    })
     
     # Add AI response to conversation context
-    user_state["conversation_context"].append({
+    user_state.conversation_context.append({
         "role": "assistant",
         "content": response_message,
         "timestamp": "now"
     })
     
     # Reset user state after analysis completion to allow new conversations
-    user_state["status"] = "idle"
-    user_state["analysis_type"] = None
-    user_state["collected_params"] = {}
+    user_state.status = "idle"
+    user_state.analysis_type = None
+    user_state.collected_params = {}
     
     return {
         "message": response_message,
@@ -552,51 +521,133 @@ main_agent = Agent(
 )
 
 # Actual GEE API call functions
+ANALYSIS_API_BASE_URL = "http://localhost:8000"  # FastAPI server URL
+API_REQUEST_TIMEOUT = 30.0  # seconds, per request
+
+# Shared HTTP client so the API calls reuse pooled keep-alive connections
+_http_client = None
+
+def get_http_client():
+    """Return the shared httpx.AsyncClient, creating it on first use"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=ANALYSIS_API_BASE_URL,
+            timeout=httpx.Timeout(API_REQUEST_TIMEOUT),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Retry and circuit breaker settings for the analysis API
+API_MAX_ATTEMPTS = 3
+API_BACKOFF_BASE = 0.25  # seconds, doubled per attempt
+API_RETRY_DEADLINE = 45.0  # seconds, upper bound on all attempts of one call
+# Only these are safe to send again after a failure the server may have partly processed
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+BREAKER_FAIL_THRESHOLD = 3
+BREAKER_OPEN_SECONDS = 30.0
+
+# Per-endpoint breaker state: consecutive failed requests and when the breaker closes again
+_breaker_states: Dict[str, Dict[str, float]] = {}
+
+class ServiceUnavailableError(Exception):
+    """Raised without a network round-trip while an endpoint's breaker is open"""
+
+async def _request_with_breaker(method: str, endpoint: str, **kwargs):
+    """Send a request to the analysis API with bounded retries and a circuit breaker
+    
+    Connection errors and 5xx responses of idempotent methods are retried with
+    exponential backoff until API_RETRY_DEADLINE; other methods are sent once.
+    After BREAKER_FAIL_THRESHOLD failed requests the endpoint is short-circuited
+    for BREAKER_OPEN_SECONDS.
+    """
+    state = _breaker_states.setdefault(endpoint, {"fail_count": 0, "open_until": 0.0})
+    if time.monotonic() < state["open_until"]:
+        raise ServiceUnavailableError(f"Analysis service unavailable: {endpoint}")
+    
+    client = get_http_client()
+    max_attempts = API_MAX_ATTEMPTS if method.upper() in IDEMPOTENT_METHODS else 1
+    deadline = time.monotonic() + API_RETRY_DEADLINE
+    for attempt in range(max_attempts):
+        # Each attempt only gets the time left before the overall deadline
+        remaining = deadline - time.monotonic()
+        try:
+            response = await client.request(
+                method, endpoint, timeout=min(remaining, API_REQUEST_TIMEOUT), **kwargs
+            )
+            response.raise_for_status()
+            state["fail_count"] = 0
+            return response
+        except httpx.HTTPStatusError as e:
+            # Client errors are not transient; don't retry or trip the breaker
+            if e.response.status_code < 500:
+                raise
+            error = e
+        except httpx.TransportError as e:
+            error = e
+        
+        backoff = API_BACKOFF_BASE * 2 ** attempt
+        if attempt + 1 >= max_attempts or time.monotonic() + backoff >= deadline:
+            break
+        await asyncio.sleep(backoff)
+    
+    state["fail_count"] += 1
+    if state["fail_count"] >= BREAKER_FAIL_THRESHOLD:
+        state["open_until"] = time.monotonic() + BREAKER_OPEN_SECONDS
+        logger.warning("Circuit breaker opened for %s", endpoint)
+    raise error
+
+@lru_cache(maxsize=4096)
+def _cached_bbox(lat: Optional[float], lng: Optional[float], analysis_type: str) -> Dict[str, float]:
+    """Bbox for a location and analysis type; shared between calls, so don't mutate the result"""
+    coordinates = {key: value for key, value in (("lat", lat), ("lng", lng)) if value is not None}
+    return calculate_bbox(coordinates, get_standard_buffer(analysis_type))
+
 async def call_sea_level_analysis_api(params: Dict[str, Any]) -> Dict[str, Any]:
     """Sea Level Rise analysis API call"""
     try:
-        import httpx
-        
-        # API endpoint URL
-        base_url = "http://localhost:8000"  # FastAPI server URL
         endpoint = "/analysis/sea-level-rise"
         
         # Configure request parameters (GET request)
         coordinates = params.get("coordinates", {})
-        buffer = get_standard_buffer("sea_level_rise")
-        bbox_params = calculate_bbox(coordinates, buffer)
-        bbox_params["threshold"] = params.get("threshold", 2.0)
+        bbox_params = _cached_bbox(coordinates.get("lat"), coordinates.get("lng"), "sea_level_rise")
+        bbox_params = {**bbox_params, "threshold": params.get("threshold", 2.0)}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{base_url}{endpoint}", params=bbox_params)
-            response.raise_for_status()
-            result = response.json()
-            
-            dashboard_updates = [
-                {
-                    "type": "map_update",
-                    "data": result.get("map_data", {}),
-                    "center": [params.get("coordinates", {}).get("lng", 0), 
-                             params.get("coordinates", {}).get("lat", 0)],
-                    "zoom": 10
-                },
-                {
-                    "type": "chart_update", 
-                    "data": result.get("chart_data", {}),
-                    "chart_type": "sea_level_rise"
-                }
-            ]
-            
-            print(f"🔍 [API Call] Sea Level Rise dashboard_updates created: {len(dashboard_updates)} items")
-            print(f"🔍 [API Call] Dashboard updates content: {dashboard_updates}")
-            
-            return {
-                "success": True,
-                "data": result,
-                "dashboard_updates": dashboard_updates
+        response = await _request_with_breaker("GET", endpoint, params=bbox_params)
+        result = orjson.loads(response.content)
+        
+        dashboard_updates = [
+            {
+                "type": "map_update",
+                "data": result.get("map_data", {}),
+                "center": [params.get("coordinates", {}).get("lng", 0), 
+                         params.get("coordinates", {}).get("lat", 0)],
+                "zoom": 10
+            },
+            {
+                "type": "chart_update", 
+                "data": result.get("chart_data", {}),
+                "chart_type": "sea_level_rise"
             }
+        ]
+        
+        logger.debug("Sea Level Rise dashboard_updates created: %s items", len(dashboard_updates))
+        logger.debug("Dashboard updates content: %s", dashboard_updates)
+        
+        return {
+            "success": True,
+            "data": result,
+            "dashboard_updates": dashboard_updates
+        }
     except Exception as e:
-        print(f"❌ [API Call] Sea Level Rise API error: {e}")
+        logger.warning("Sea Level Rise API error: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -606,41 +657,35 @@ async def call_sea_level_analysis_api(params: Dict[str, Any]) -> Dict[str, Any]:
 async def call_urban_analysis_api(params: Dict[str, Any]) -> Dict[str, Any]:
     """Urban Analysis API 호출"""
     try:
-        import httpx
-        
-        base_url = "http://localhost:8000"
         endpoint = "/analysis/urban-area-comprehensive-stats"
         
         # Configure request parameters (GET request)
         coordinates = params.get("coordinates", {})
-        buffer = get_standard_buffer("urban_analysis")
-        bbox_params = calculate_bbox(coordinates, buffer)
+        bbox_params = _cached_bbox(coordinates.get("lat"), coordinates.get("lng"), "urban_analysis")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{base_url}{endpoint}", params=bbox_params)
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "success": True,
-                "data": result,
-                "dashboard_updates": [
-                    {
-                        "type": "map_update",
-                        "data": result.get("map_data", {}),
-                        "center": [params.get("coordinates", {}).get("lng", 0), 
-                                 params.get("coordinates", {}).get("lat", 0)],
-                        "zoom": 10
-                    },
-                    {
-                        "type": "chart_update",
-                        "data": result.get("chart_data", {}),
-                        "chart_type": "urban_analysis"
-                    }
-                ]
-            }
+        response = await _request_with_breaker("GET", endpoint, params=bbox_params)
+        result = orjson.loads(response.content)
+        
+        return {
+            "success": True,
+            "data": result,
+            "dashboard_updates": [
+                {
+                    "type": "map_update",
+                    "data": result.get("map_data", {}),
+                    "center": [params.get("coordinates", {}).get("lng", 0), 
+                             params.get("coordinates", {}).get("lat", 0)],
+                    "zoom": 10
+                },
+                {
+                    "type": "chart_update",
+                    "data": result.get("chart_data", {}),
+                    "chart_type": "urban_analysis"
+                }
+            ]
+        }
     except Exception as e:
-        print(f"❌ [API Call] Urban Analysis API error: {e}")
+        logger.warning("Urban Analysis API error: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -650,41 +695,35 @@ async def call_urban_analysis_api(params: Dict[str, Any]) -> Dict[str, Any]:
 async def call_infrastructure_analysis_api(params: Dict[str, Any]) -> Dict[str, Any]:
     """Infrastructure Analysis API 호출"""
     try:
-        import httpx
-        
-        base_url = "http://localhost:8000"
         endpoint = "/analysis/infrastructure-exposure"
         
         # Configure request parameters (GET request)
         coordinates = params.get("coordinates", {})
-        buffer = get_standard_buffer("infrastructure_analysis")
-        bbox_params = calculate_bbox(coordinates, buffer)
+        bbox_params = _cached_bbox(coordinates.get("lat"), coordinates.get("lng"), "infrastructure_analysis")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{base_url}{endpoint}", params=bbox_params)
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "success": True,
-                "data": result,
-                "dashboard_updates": [
-                    {
-                        "type": "map_update",
-                        "data": result.get("map_data", {}),
-                        "center": [params.get("coordinates", {}).get("lng", 0), 
-                                 params.get("coordinates", {}).get("lat", 0)],
-                        "zoom": 10
-                    },
-                    {
-                        "type": "chart_update",
-                        "data": result.get("chart_data", {}),
-                        "chart_type": "infrastructure_exposure"
-                    }
-                ]
-            }
+        response = await _request_with_breaker("GET", endpoint, params=bbox_params)
+        result = orjson.loads(response.content)
+        
+        return {
+            "success": True,
+            "data": result,
+            "dashboard_updates": [
+                {
+                    "type": "map_update",
+                    "data": result.get("map_data", {}),
+                    "center": [params.get("coordinates", {}).get("lng", 0), 
+                             params.get("coordinates", {}).get("lat", 0)],
+                    "zoom": 10
+                },
+                {
+                    "type": "chart_update",
+                    "data": result.get("chart_data", {}),
+                    "chart_type": "infrastructure_exposure"
+                }
+            ]
+        }
     except Exception as e:
-        print(f"❌ [API Call] Infrastructure Analysis API error: {e}")
+        logger.warning("Infrastructure Analysis API error: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -694,9 +733,6 @@ async def call_infrastructure_analysis_api(params: Dict[str, Any]) -> Dict[str,
 async def call_topic_modeling_api(params: Dict[str, Any]) -> Dict[str, Any]:
     """Topic Modeling API 호출"""
     try:
-        import httpx
-        
-        base_url = "http://localhost:8000"
         endpoint = "/analysis/topic-modeling"
         
         # 요청 데이터 구성 (POST 요청)
@@ -706,24 +742,26 @@ async def call_topic_modeling_api(params: Dict[str, Any]) -> Dict[str, Any]:
             "topics": params.get("topics", 5)
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{base_url}{endpoint}", json=request_data)
-            response.raise_for_status()
-            result = response.json()
-            
-            return {
-                "success": True,
-                "data": result,
-                "dashboard_updates": [
-                    {
-                        "type": "chart_update",
-                        "data": result.get("chart_data", {}),
-                        "chart_type": "topic_modeling"
-                    }
-                ]
-            }
+        response = await _request_with_breaker(
+            "POST", endpoint,
+            content=orjson.dumps(request_data),
+            headers={"content-type": "application/json"}
+        )
+        result = orjson.loads(response.content)
+        
+        return {
+            "success": True,
+            "data": result,
+            "dashboard_updates": [
+                {
+                    "type": "chart_update",
+                    "data": result.get("chart_data", {}),
+                    "chart_type": "topic_modeling"
+                }
+            ]
+        }
     except Exception as e:
-        print(f"❌ [API Call] Topic Modeling API error: {e}")
+        logger.warning("Topic Modeling API error: %s", e)
         return {
             "success": False,
             "error": str(e),
@@ -2,6 +2,9 @@
 Main Agent Prompts
 """
 
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
 def get_main_agent_instruction() -> str:
     """Return the main agent's instructions."""
     return """
@@ -35,6 +38,7 @@ Parameter collection rules:
 Always respond to users in a friendly and clear manner.
 """
 
+@lru_cache(maxsize=1)
 def get_global_instruction() -> str:
     """Return global instructions."""
     return """
@@ -3,7 +3,9 @@ Main Agent Tools
 """
 
 import os
-from typing import Dict, Any
+import logging
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from google.adk.tools import ToolContext
 from google.adk.tools.agent_tool import AgentTool
 
@@ -13,6 +15,8 @@ from ..infrastructure_agent.agent import infrastructure_agent
 from ..topic_modeling_agent.agent import topic_modeling_agent
 from ..shared.utils.parameter_collector import parameter_collector
 
+logger = logging.getLogger(__name__)
+
 async def call_sea_level_agent(
     request: str,
     tool_context: ToolContext
@@ -85,57 +89,62 @@ async def collect_parameters(
     existing_params = tool_context.state.get("collected_params", {})
     
     # Collect parameters
-    result = parameter_collector.collect_parameters(
+    result = await parameter_collector.collect_parameters(
         message, analysis_type, existing_params
     )
     
     # Update state
-    tool_context.state["collected_params"] = result["params"]
+    tool_context.state["collected_params"] = result.params
     tool_context.state["analysis_type"] = analysis_type
     
-    return result
+    # Tool results go back to the model as plain dicts
+    return {
+        "params": result.params,
+        "validation": result.validation._asdict(),
+        "needs_more_info": result.needs_more_info
+    }
 
-async def detect_analysis_intent(
-    message: str,
-    callback_context
-) -> Dict[str, Any]:
-    """Detect analysis intent."""
-    print(f"🔍 [Main Agent] Detecting analysis intent for: {message}")
-    
-    message_lower = message.lower()
-    
+# Keywords per analysis type, checked in this order
+INTENT_KEYWORDS = (
     # Sea level rise related keywords
-    sea_level_keywords = [
+    ("sea_level_rise", (
         "sea level", "slr", "해수면", "해수면 상승", "sea level rise", 
         "해수면 상승 위험", "해수면 상승 분석", "해수면 상승 위험 분석"
-    ]
-    
+    )),
     # Urban analysis related keywords
-    urban_keywords = [
+    ("urban_analysis", (
         "urban", "도시", "도시지역", "도시 분석", "도시 지역 분석",
         "urban analysis", "도시 확장", "도시화"
-    ]
-    
+    )),
     # Infrastructure analysis related keywords
-    infrastructure_keywords = [
+    ("infrastructure_analysis", (
         "infrastructure", "인프라", "인프라 노출", "인프라 분석",
         "infrastructure exposure", "인프라 노출 분석"
-    ]
-    
+    )),
     # Topic modeling related keywords
-    topic_modeling_keywords = [
+    ("topic_modeling", (
         "topic modeling", "토픽", "토픽 모델링", "토픽 분석",
         "topic analysis", "텍스트 분석"
-    ]
+    )),
+)
+
+@lru_cache(maxsize=1024)
+def _match_intent(normalized_message: str) -> Optional[str]:
+    """Keyword matching on a normalized message (cached, repeated phrases are common)"""
+    for intent, keywords in INTENT_KEYWORDS:
+        if any(keyword in normalized_message for keyword in keywords):
+            return intent
+    return None
+
+async def detect_analysis_intent(
+    message: str,
+    callback_context
+) -> Dict[str, Any]:
+    """Detect analysis intent."""
+    logger.debug("Detecting analysis intent for: %s", message)
     
-    # Keyword matching
-    if any(keyword in message_lower for keyword in sea_level_keywords):
-        return {"intent": "sea_level_rise", "confidence": 0.9}
-    elif any(keyword in message_lower for keyword in urban_keywords):
-        return {"intent": "urban_analysis", "confidence": 0.9}
-    elif any(keyword in message_lower for keyword in infrastructure_keywords):
-        return {"intent": "infrastructure_analysis", "confidence": 0.9}
-    elif any(keyword in message_lower for keyword in topic_modeling_keywords):
-        return {"intent": "topic_modeling", "confidence": 0.9}
+    intent = _match_intent(message.strip().lower())
+    if intent:
+        return {"intent": intent, "confidence": 0.9}
     
     return {"intent": None, "confidence": 0.0}
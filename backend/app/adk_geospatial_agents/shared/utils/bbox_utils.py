@@ -3,6 +3,7 @@ Bounding Box 계산 유틸리티
 좌표와 buffer를 받아서 일관된 bbox를 생성합니다.
 """
 
+from functools import lru_cache
 from typing import Dict, Any, Tuple
 
 def calculate_bbox(coordinates: Dict[str, Any], buffer: float = 0.25) -> Dict[str, float]:
@@ -45,6 +46,7 @@ def calculate_bbox_from_coords(lat: float, lng: float, buffer: float = 0.25) ->
         "max_lon": lng + buffer
     }
 
+@lru_cache(maxsize=16)
 def get_standard_buffer(analysis_type: str) -> float:
     """
     분석 타입에 따른 표준 buffer 크기를 반환합니다.
@@ -3,9 +3,14 @@ Command System for Chat Reset and Navigation
 """
 
 import time
+import logging
 from enum import Enum
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .user_state import UserState, get_user_state
+
+logger = logging.getLogger(__name__)
 
 class ResetType(Enum):
     """Types of reset operations"""
@@ -14,16 +19,19 @@ class ResetType(Enum):
     STEP_BACK = "step"       # One step back
     HOME = "home"           # Return to home
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     """Command data structure"""
     type: str
     original_message: str
-    timestamp: float = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = time.time()
+    timestamp: float = field(default_factory=time.time)
+    args: str = ""  # Text following the command, e.g. "now" in "/reset now"
+
+# Bookkeeping entries in collected_params that /status doesn't report
+_STATUS_EXCLUDED_PARAMS = frozenset({'suggestion_message', 'suggested_city', 'suggested_country', 'location_error'})
+
+# Trie key marking a complete command; never equal to a single character
+_TRIE_END = ""
 
 class CommandParser:
     """Parser for slash commands"""
@@ -39,6 +47,14 @@ class CommandParser:
             "/status": "status"
         }
         
+        # Prefix trie over the command strings, walked one character at a time
+        self._command_trie = {}
+        for cmd, cmd_type in self.command_map.items():
+            node = self._command_trie
+            for char in cmd:
+                node = node.setdefault(char, {})
+            node[_TRIE_END] = cmd_type
+        
         # Command descriptions
         self.command_descriptions = {
             "/reset": "Complete reset - start a new chat session",
@@ -48,33 +64,47 @@ class CommandParser:
             "/help": "Show available commands",
             "/status": "Show current analysis status"
         }
+        
+        # Descriptions don't change after construction, so the help text is built once
+        help_lines = ["Available commands:"]
+        for cmd, desc in self.command_descriptions.items():
+            help_lines.append(f"{cmd} - {desc}")
+        self._help_message = "\n".join(help_lines)
     
     def parse_command(self, message: str) -> Optional[Command]:
         """Parse message to detect commands"""
-        message_lower = message.lower().strip()
+        # Only process slash commands; ordinary chat messages are rejected
+        # on the first character, before any case normalization
+        message = message.lstrip()
+        if not message or message[0] != '/':
+            return None
         
-        # Only process slash commands
-        if message_lower.startswith('/'):
-            return self._parse_slash_command(message_lower)
-        
-        return None
+        return self._parse_slash_command(message.rstrip().lower())
     
     def _parse_slash_command(self, message: str) -> Optional[Command]:
-        """Parse slash command"""
-        if message in self.command_map:
-            return Command(
-                type=self.command_map[message],
-                original_message=message
-            )
-        
-        return None
+        """Parse slash command (the longest command followed by whitespace or end of message)"""
+        node = self._command_trie
+        match = None
+        for i, char in enumerate(message):
+            node = node.get(char)
+            if node is None:
+                break
+            if _TRIE_END in node and (i + 1 == len(message) or message[i + 1].isspace()):
+                match = (node[_TRIE_END], i + 1)
+        
+        if match is None:
+            return None
+        
+        cmd_type, end = match
+        return Command(
+            type=cmd_type,
+            original_message=message,
+            args=message[end:].strip()
+        )
     
     def get_help_message(self) -> str:
         """Get help message with all available commands"""
-        help_lines = ["Available commands:"]
-        for cmd, desc in self.command_descriptions.items():
-            help_lines.append(f"{cmd} - {desc}")
-        return "\n".join(help_lines)
+        return self._help_message
 
 class CommandExecutor:
     """Executor for commands"""
@@ -89,52 +119,52 @@ class CommandExecutor:
             "help": None,  # Will be set dynamically
             "status": None  # Will be set dynamically
         }
+        
+        # Command type -> handler(command, user_id, callback_context)
+        self._handlers = {
+            "help": lambda command, user_id, callback_context: self._execute_help_command(),
+            "status": lambda command, user_id, callback_context: self._execute_status_command(user_id, callback_context),
+        }
+        for reset_type in ResetType:
+            self._handlers[reset_type] = lambda command, user_id, callback_context: self._execute_reset_command(
+                command.type, user_id, callback_context
+            )
     
     async def execute_command(self, command: Command, user_id: int, 
                             callback_context: Any) -> Dict[str, Any]:
         """Execute a command"""
-        print(f"🔧 [CommandExecutor] Executing command: {command.type}")
-        
-        if command.type == "help":
-            return await self._execute_help_command()
-        elif command.type == "status":
-            return await self._execute_status_command(user_id, callback_context)
-        elif isinstance(command.type, ResetType):
-            return await self._execute_reset_command(command.type, user_id, callback_context)
-        else:
-            return {
-                "message": f"Unknown command: {command.original_message}",
-                "status": "error"
-            }
+        logger.debug("Executing command: %s", command.type)
+        
+        handler = self._handlers.get(command.type)
+        if handler:
+            return handler(command, user_id, callback_context)
+        return {
+            "message": f"Unknown command: {command.original_message}",
+            "status": "error"
+        }
     
-    async def _execute_help_command(self) -> Dict[str, Any]:
+    def _execute_help_command(self) -> Dict[str, Any]:
         """Execute help command"""
-        parser = CommandParser()
-        help_message = parser.get_help_message()
+        help_message = command_parser.get_help_message()
         
         return {
             "message": help_message,
             "status": "command_help"
         }
     
-    async def _execute_status_command(self, user_id: int, callback_context: Any) -> Dict[str, Any]:
+    def _execute_status_command(self, user_id: int, callback_context: Any) -> Dict[str, Any]:
         """Execute status command"""
-        user_states = callback_context.state.get("user_states", {})
-        user_state = user_states.get(user_id, {})
+        user_state = get_user_state(user_id)
         
-        analysis_type = user_state.get("analysis_type", "None")
-        status = user_state.get("status", "idle")
-        collected_params = user_state.get("collected_params", {})
+        analysis_type = user_state.analysis_type
+        status = user_state.status
+        collected_params = user_state.collected_params
         
         # Format collected parameters
-        params_text = "None"
-        if collected_params:
-            param_items = []
-            for key, value in collected_params.items():
-                if key not in ['suggestion_message', 'suggested_city', 'suggested_country', 'location_error']:
-                    param_items.append(f"{key}: {value}")
-            if param_items:
-                params_text = ", ".join(param_items)
+        params_text = ", ".join(
+            f"{key}: {value}" for key, value in (collected_params or {}).items()
+            if key not in _STATUS_EXCLUDED_PARAMS
+        ) or "None"
         
         status_message = f"Current analysis type: {analysis_type}\n"
         status_message += f"Status: {status}\n"
@@ -145,32 +175,25 @@ class CommandExecutor:
             "status": "command_status"
         }
     
-    async def _execute_reset_command(self, reset_type: ResetType, user_id: int, 
-                                   callback_context: Any) -> Dict[str, Any]:
+    def _execute_reset_command(self, reset_type: ResetType, user_id: int, 
+                               callback_context: Any) -> Dict[str, Any]:
         """Execute reset command"""
-        print(f"🔧 [CommandExecutor] Executing reset: {reset_type.value}")
-        
-        user_states = callback_context.state.get("user_states", {})
-        if user_id not in user_states:
-            user_states[user_id] = {}
+        logger.debug("Executing reset: %s", reset_type.value)
         
-        user_state = user_states[user_id]
+        user_state = get_user_state(user_id)
         
         # Execute reset based on type
         if reset_type == ResetType.FULL_RESET:
-            await self._full_reset(user_state)
+            self._full_reset(user_state)
         elif reset_type == ResetType.HOME:
-            await self._home_reset(user_state)
+            self._home_reset(user_state)
         elif reset_type == ResetType.STEP_BACK:
-            await self._step_back_reset(user_state)
+            self._step_back_reset(user_state)
         elif reset_type == ResetType.PARAMETER_RESET:
-            await self._parameter_reset(user_state)
+            self._parameter_reset(user_state)
         
         # Add command to conversation context
-        if "conversation_context" not in user_state:
-            user_state["conversation_context"] = []
-        
-        user_state["conversation_context"].append({
+        user_state.conversation_context.append({
             "role": "user",
             "content": f"Command: {reset_type.value}",
             "timestamp": "now"
@@ -182,41 +205,37 @@ class CommandExecutor:
             "reset_type": reset_type.value
         }
     
-    async def _full_reset(self, user_state: Dict[str, Any]):
+    def _full_reset(self, user_state: UserState):
         """Perform full reset"""
-        user_state.update({
-            "status": "idle",
-            "analysis_type": None,
-            "collected_params": {},
-            "conversation_context": [],
-            "last_reset_time": time.time()
-        })
-        print(f"🔧 [CommandExecutor] Full reset completed")
+        user_state.status = "idle"
+        user_state.analysis_type = None
+        user_state.collected_params = {}
+        user_state.conversation_context.clear()
+        user_state.last_reset_time = time.time()
+        logger.debug("Full reset completed")
     
-    async def _home_reset(self, user_state: Dict[str, Any]):
+    def _home_reset(self, user_state: UserState):
         """Perform home reset"""
-        user_state.update({
-            "status": "idle",
-            "analysis_type": None,
-            "collected_params": {},
-            "last_reset_time": time.time()
-        })
-        print(f"🔧 [CommandExecutor] Home reset completed")
+        user_state.status = "idle"
+        user_state.analysis_type = None
+        user_state.collected_params = {}
+        user_state.last_reset_time = time.time()
+        logger.debug("Home reset completed")
     
-    async def _step_back_reset(self, user_state: Dict[str, Any]):
+    def _step_back_reset(self, user_state: UserState):
         """Perform step back reset"""
         # Keep analysis_type but reset parameters
-        user_state["collected_params"] = {}
-        if user_state.get("status") == "awaiting_confirmation":
-            user_state["status"] = "collecting_parameters"
-        print(f"🔧 [CommandExecutor] Step back reset completed")
+        user_state.collected_params = {}
+        if user_state.status == "awaiting_confirmation":
+            user_state.status = "collecting_parameters"
+        logger.debug("Step back reset completed")
     
-    async def _parameter_reset(self, user_state: Dict[str, Any]):
+    def _parameter_reset(self, user_state: UserState):
         """Perform parameter reset"""
-        user_state["collected_params"] = {}
-        if user_state.get("status") in ["collecting_parameters", "awaiting_confirmation"]:
-            user_state["status"] = "collecting_parameters"
-        print(f"🔧 [CommandExecutor] Parameter reset completed")
+        user_state.collected_params = {}
+        if user_state.status in ["collecting_parameters", "awaiting_confirmation"]:
+            user_state.status = "collecting_parameters"
+        logger.debug("Parameter reset completed")
 
 # Global instances
 command_parser = CommandParser()
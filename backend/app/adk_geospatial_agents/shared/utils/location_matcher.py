@@ -163,10 +163,13 @@ class LocationMatcher:
         print(f"🔍 [LocationMatcher] extract_location_from_message called with: '{message}' (search_type: {search_type})")
         
         # 부정적 응답 처리 ("No," 제거)
+        # 소문자 변환은 한 번만 수행 (부정어 접두사는 모두 소문자/한글)
+        message_lower = message.lower()
         negative_words = ["no,", "아니", "아니요", "아니다"]
         for word in negative_words:
-            if message.lower().startswith(word):
+            if message_lower.startswith(word):
                 message = message[len(word):].strip()
+                message_lower = message.lower()
                 print(f"🔍 [LocationMatcher] After negative word processing: '{message}'")
                 break
         
@@ -177,8 +180,8 @@ class LocationMatcher:
             'yes', 'no', '응', '아니', '맞아', '맞다', 'ok', 'okay'
         }
         
-        if message.lower() in non_location_words:
-            print(f"🔍 [LocationMatcher] Ignoring non-location word: '{message.lower()}'")
+        if message_lower in non_location_words:
+            print(f"🔍 [LocationMatcher] Ignoring non-location word: '{message_lower}'")
             return {"found": False, "message": "위치 정보가 아닙니다."}
         
         # 쉼표로 구분된 경우 (예: "Seoul, South Korea")
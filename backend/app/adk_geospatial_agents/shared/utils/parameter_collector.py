@@ -3,68 +3,226 @@ ADK Parameter Collection Utility - Strategy Pattern Implementation
 """
 
 import re
+import copy
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
 from .location_matcher import location_matcher
 
+# Worker threads for blocking work (fuzzy location matching over the cities table)
+# so it doesn't stall the event loop for other users
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="adk-sync")
+
+# range membership is an O(1) bounds check for ints (a list was scanned element by element)
+VALID_YEARS = range(2000, 2025)
+
+def _check_year(param: str, value: Any) -> Optional[str]:
+    """Error message for a year outside VALID_YEARS, else None"""
+    if value not in VALID_YEARS:
+        return f"{param} must be between 2000-2024, got {value}"
+    return None
+
+def _check_threshold(param: str, value: Any) -> Optional[str]:
+    """Error message for a threshold outside 0.5-5.0, else None"""
+    if not (0.5 <= value <= 5.0):
+        return f"{param} must be between 0.5-5.0, got {value}"
+    return None
+
+# Value checks per required param; params without an entry only need to be present
+_VALIDATORS = {
+    "year": _check_year,
+    "start_year": _check_year,
+    "end_year": _check_year,
+    "threshold": _check_threshold,
+}
+
+# Fallback questions for params a strategy has no question for
+_DEFAULT_QUESTIONS = {
+    "year": "What year would you like to analyze? (2001-2020) (e.g., 2020, 2018)",
+    "start_year": "Please enter the start year (2001-2020) (e.g., 2014, 2015)",
+    "end_year": "Please enter the end year (2001-2020) (e.g., 2020, 2019)",
+    "threshold": "Please set the sea level rise threshold (e.g., 1.0m, 2.5m)",
+    "city_name": "Which city would you like to analyze? (e.g., Seoul, Busan, New York)",
+    "country_name": "Which country would you like to analyze? (e.g., South Korea, United States)",
+    "method": "Please select the topic modeling method (lda, nmf, bertopic)",
+    "n_topics": "How many topics would you like to analyze? (e.g., 5, 10)"
+}
+
+# Location error/suggestion entries that become stale once a location is known
+_LOCATION_NOISE_KEYS = ('location_error', 'suggestion_message', 'suggested_city', 'suggested_country')
+
+# Only this much of a message is scanned for years, thresholds and topic settings;
+# parameter answers are short and it bounds regex cost on pasted walls of text
+MAX_SCAN_LENGTH = 1024
+
+# Entries kept by ParameterCollector._extract_parameters
+EXTRACTION_CACHE_SIZE = 1024
+
+def shutdown_executor():
+    """Stop the worker threads (called on application shutdown)"""
+    _POOL.shutdown(wait=False, cancel_futures=True)
+
+# Parameter patterns, compiled once at import and shared by all strategies.
+# Patterns opening with \d+ only start at the beginning of a digit run ((?<!\d) keeps
+# the same leftmost match) so a long run of digits isn't rescanned from every position.
+_YEAR_RANGE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d{4})\s*[-~]\s*(\d{4})',
+    r'(\d{4})\s+to\s+(\d{4})',
+    r'(\d{4})\s+부터\s+(\d{4})\s+까지',
+    r'from\s+(\d{4})\s+to\s+(\d{4})',
+    r'(\d{4})\s*-\s*(\d{4})'
+))
+_YEAR_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d{4})', r'year\s*:?\s*(\d{4})', r'in\s+(\d{4})', r'(\d{4})\s*year', r'(\d{4})\s*년'
+))
+_THRESHOLD_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?<!\d)(\d+(?:\.\d+)?)\s*(?:meter|m|meters|미터)',
+    r'threshold\s*:?\s*(\d+(?:\.\d+)?)',
+    r'(?<!\d)(\d+(?:\.\d+)?)\s*m\s*threshold'
+))
+_METHOD_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'\b(lda|nmf|bertopic)\b',
+    r'method\s*:?\s*(lda|nmf|bertopic)'
+))
+_N_TOPICS_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?<!\d)(\d+)\s*(?:topics|topic)',
+    r'n_topics\s*:?\s*(\d+)'
+))
+
+# Single pass over the message telling which pattern families can match at all:
+# every year pattern needs a run of 4+ digits, every range pattern two such runs
+# and every threshold pattern a digit plus an "m", "미터" or "threshold"
+_LOCATION_TOKEN_PATTERN = re.compile(r'(?P<year>\d{4,})|(?P<number>\d+)|(?P<unit>m|미터|threshold)', re.IGNORECASE)
+_TOPIC_TOKEN_PATTERN = re.compile(r'(?P<method>lda|nmf|bertopic)|(?P<number>\d+)', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def _cached_location(message: str, search_type: str) -> Dict[str, Any]:
+    """Fuzzy location match (cached, the same answer is often re-sent across turns)"""
+    return location_matcher.extract_location_from_message(message, search_type)
+
+def _match_location(message: str, search_type: str) -> Dict[str, Any]:
+    """Copy of the cached match so callers can't mutate the cache entry"""
+    return copy.deepcopy(_cached_location(message, search_type))
+
+def clear_location_cache():
+    """Forget cached location matches (call after reloading the cities data)"""
+    _cached_location.cache_clear()
+    # Cached extraction results embed location matches too
+    parameter_collector._extraction_cache.clear()
+
+def _get_field(self, key):
+    """Index by field name as well as position, for callers written against the old dicts"""
+    if isinstance(key, str):
+        return getattr(self, key)
+    return tuple.__getitem__(self, key)
+
+class ValidationResult(NamedTuple):
+    """Outcome of ParameterCollector._validate_parameters"""
+    valid: bool
+    missing: Tuple[str, ...]
+    invalid: Tuple[str, ...]
+    params: Dict[str, Any]
+    
+    __getitem__ = _get_field
+
+class CollectResult(NamedTuple):
+    """Outcome of ParameterCollector.collect_parameters"""
+    params: Dict[str, Any]  # The caller's params dict, left mutable since it is stored as user state
+    validation: ValidationResult
+    needs_more_info: bool
+    
+    __getitem__ = _get_field
+
 class ParameterExtractionStrategy(ABC):
     """Base strategy for parameter extraction"""
     
+    __slots__ = ()
+    
     @abstractmethod
     async def extract(self, message: str, existing_params: Dict[str, Any]) -> Dict[str, Any]:
         """Extract parameters from message"""
         pass
     
     @abstractmethod
-    def get_required_params(self) -> List[str]:
-        """Get list of required parameters for this analysis type"""
+    def get_required_params(self) -> Tuple[str, ...]:
+        """Get required parameters for this analysis type"""
         pass
     
     @abstractmethod
     def get_parameter_questions(self) -> Dict[str, str]:
-        """Get parameter questions for this analysis type"""
+        """Get parameter questions for this analysis type (shared, don't modify)"""
         pass
 
 class LocationBasedStrategy(ParameterExtractionStrategy):
     """Strategy for analyses requiring location data (sea level, urban, infrastructure)"""
     
+    __slots__ = ('analysis_type', 'valid_thresholds', '_required_params', '_parameter_questions')
+    
     def __init__(self, analysis_type: str):
         self.analysis_type = analysis_type
-        self.valid_years = list(range(2000, 2025))
         self.valid_thresholds = (0.5, 5.0)
+        
+        # Required params and questions only depend on the analysis type; built once
+        self._parameter_questions = {
+            "country_name": "Which country would you like to analyze? (e.g., South Korea, United States)",
+            "city_name": "Which city would you like to analyze? (e.g., Seoul, Busan, New York)",
+            "threshold": "Please set the sea level rise threshold (e.g., 2.0m, 1.5m)"
+        }
+        if analysis_type == "urban_analysis":
+            self._required_params = ("country_name", "city_name", "start_year", "end_year", "threshold")
+            self._parameter_questions.update({
+                "start_year": "Please enter the start year (2001-2020) (e.g., 2014, 2015)",
+                "end_year": "Please enter the end year (2001-2020) (e.g., 2020, 2019)"
+            })
+        else:
+            self._required_params = ("country_name", "city_name", "year", "threshold")
+            self._parameter_questions["year"] = "What year would you like to analyze? (2001-2020) (e.g., 2020, 2018)"
     
     async def extract(self, message: str, existing_params: Dict[str, Any]) -> Dict[str, Any]:
         """Extract parameters for location-based analyses"""
         extracted = {}
-        message_lower = message.lower()
+        scan_text = message[:MAX_SCAN_LENGTH]
+        kinds = [m.lastgroup for m in _LOCATION_TOKEN_PATTERN.finditer(scan_text)]
         
         # Extract location information first
-        extracted.update(await self._extract_location_info(message, existing_params))
+        await self._extract_location_info(message, extracted, existing_params)
         
         # Extract year parameters
-        extracted.update(await self._extract_year_params(message_lower, existing_params))
+        if 'year' in kinds:
+            # Range patterns need two separate year-length digit runs
+            self._extract_year_params(
+                scan_text, extracted, existing_params, may_have_range=kinds.count('year') >= 2
+            )
         
         # Extract threshold
-        extracted.update(await self._extract_threshold(message_lower))
+        if 'unit' in kinds and ('number' in kinds or 'year' in kinds):
+            self._extract_threshold(scan_text, extracted)
         
         return extracted
     
-    async def _extract_location_info(self, message: str, existing_params: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract location information (city/country)"""
-        extracted = {}
+    async def _extract_location_info(self, message: str, extracted: Dict[str, Any], existing_params: Dict[str, Any]) -> None:
+        """Add location information (city/country) to extracted"""
+        # Messages without any letters (e.g. a bare "2020" answer) can't name a place,
+        # so skip the fuzzy match entirely
+        if not any(c.isalpha() for c in message):
+            if not (existing_params and existing_params.get('city_name') and existing_params.get('country_name')):
+                extracted['location_error'] = "Location information not found."
+            return
+        
+        loop = asyncio.get_running_loop()
         
         # Try city search first
-        city_result = location_matcher.extract_location_from_message(message, "city")
+        city_result = await loop.run_in_executor(
+            _POOL, _match_location, message, "city"
+        )
         if city_result["found"]:
             if city_result.get("exact_match", False):
                 extracted['city_name'] = city_result["city"]
                 extracted['country_name'] = city_result["country"]
                 extracted['coordinates'] = city_result["coordinates"]
-                # Successfully found location, remove existing suggestions and errors
-                if existing_params:
-                    for key in ['location_error', 'suggestion_message', 'suggested_city', 'suggested_country']:
-                        if key in existing_params:
-                            del existing_params[key]
             else:
                 # Suggest similar cities
                 extracted['suggested_city'] = city_result.get("suggested_city")
@@ -72,18 +230,15 @@ class LocationBasedStrategy(ParameterExtractionStrategy):
                 extracted['suggestion_message'] = city_result.get("message")
         else:
             # If city not found, try country search
-            country_result = location_matcher.extract_location_from_message(message, "country")
+            country_result = await loop.run_in_executor(
+                _POOL, _match_location, message, "country"
+            )
             if country_result["found"]:
                 if country_result.get("exact_match", False):
                     extracted['country_name'] = country_result["country"]
                     # Suggest major cities in that country
                     if country_result.get("cities"):
                         extracted['suggested_cities'] = country_result["cities"]
-                    # Successfully found location, remove existing suggestions and errors
-                    if existing_params:
-                        for key in ['location_error', 'suggestion_message', 'suggested_city', 'suggested_country']:
-                            if key in existing_params:
-                                del existing_params[key]
                 else:
                     # Suggest similar countries
                     extracted['suggested_country'] = country_result.get("suggested_country")
@@ -91,29 +246,32 @@ class LocationBasedStrategy(ParameterExtractionStrategy):
             else:
                 # Location information not found
                 extracted['location_error'] = "Location information not found."
-        
-        return extracted
     
-    async def _extract_year_params(self, message_lower: str, existing_params: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract year parameters based on analysis type"""
-        extracted = {}
+    def _extract_year_params(self, message: str, extracted: Dict[str, Any], existing_params: Dict[str, Any],
+                             may_have_range: bool = True) -> None:
+        """Add year parameters to extracted based on analysis type"""
+        # Fast path for the common bare "2020" reply; the patterns below would all
+        # land on the same four digits
+        stripped = message.strip()
+        if len(stripped) == 4 and stripped.isascii() and stripped.isdigit():
+            year = int(stripped)
+            if year in VALID_YEARS:
+                if self.analysis_type != "urban_analysis":
+                    extracted['year'] = year
+                elif 'start_year' in existing_params:
+                    extracted['end_year'] = year
+                else:
+                    extracted['start_year'] = year
+            return
         
         if self.analysis_type == "urban_analysis":
             # Extract year range for urban analysis
-            range_patterns = [
-                r'(\d{4})\s*[-~]\s*(\d{4})',
-                r'(\d{4})\s+to\s+(\d{4})',
-                r'(\d{4})\s+부터\s+(\d{4})\s+까지',
-                r'from\s+(\d{4})\s+to\s+(\d{4})',
-                r'(\d{4})\s*-\s*(\d{4})'
-            ]
-            
-            for pattern in range_patterns:
-                match = re.search(pattern, message_lower)
+            for pattern in _YEAR_RANGE_PATTERNS if may_have_range else ():
+                match = pattern.search(message)
                 if match:
                     start_year = int(match.group(1))
                     end_year = int(match.group(2))
-                    if (start_year in self.valid_years and end_year in self.valid_years and 
+                    if (start_year in VALID_YEARS and end_year in VALID_YEARS and 
                         start_year <= end_year):
                         extracted['start_year'] = start_year
                         extracted['end_year'] = end_year
@@ -121,12 +279,11 @@ class LocationBasedStrategy(ParameterExtractionStrategy):
             
             # Extract individual year if range not found
             if 'start_year' not in extracted and 'end_year' not in extracted:
-                year_patterns = [r'(\d{4})', r'year\s*:?\s*(\d{4})', r'in\s+(\d{4})', r'(\d{4})\s*year', r'(\d{4})\s*년']
-                for pattern in year_patterns:
-                    match = re.search(pattern, message_lower)
+                for pattern in _YEAR_PATTERNS:
+                    match = pattern.search(message)
                     if match:
                         year = int(match.group(1))
-                        if year in self.valid_years:
+                        if year in VALID_YEARS:
                             if 'start_year' in existing_params:
                                 extracted['end_year'] = year
                             else:
@@ -134,124 +291,85 @@ class LocationBasedStrategy(ParameterExtractionStrategy):
                             break
         else:
             # Extract single year for other analyses
-            year_patterns = [r'(\d{4})', r'year\s*:?\s*(\d{4})', r'in\s+(\d{4})', r'(\d{4})\s*year', r'(\d{4})\s*년']
-            for pattern in year_patterns:
-                match = re.search(pattern, message_lower)
+            for pattern in _YEAR_PATTERNS:
+                match = pattern.search(message)
                 if match:
                     year = int(match.group(1))
-                    if year in self.valid_years:
+                    if year in VALID_YEARS:
                         extracted['year'] = year
                         break
-        
-        return extracted
     
-    async def _extract_threshold(self, message_lower: str) -> Dict[str, Any]:
-        """Extract threshold parameter"""
-        extracted = {}
-        
-        threshold_patterns = [
-            r'(\d+(?:\.\d+)?)\s*(?:meter|m|meters|미터)',
-            r'threshold\s*:?\s*(\d+(?:\.\d+)?)',
-            r'(\d+(?:\.\d+)?)\s*m\s*threshold'
-        ]
-        
-        for pattern in threshold_patterns:
-            match = re.search(pattern, message_lower)
+    def _extract_threshold(self, message: str, extracted: Dict[str, Any]) -> None:
+        """Add threshold parameter to extracted"""
+        for pattern in _THRESHOLD_PATTERNS:
+            match = pattern.search(message)
             if match:
                 threshold = float(match.group(1))
                 if self.valid_thresholds[0] <= threshold <= self.valid_thresholds[1]:
                     extracted['threshold'] = threshold
                     break
-        
-        return extracted
     
-    def get_required_params(self) -> List[str]:
+    def get_required_params(self) -> Tuple[str, ...]:
         """Get required parameters based on analysis type"""
-        if self.analysis_type == "urban_analysis":
-            return ["country_name", "city_name", "start_year", "end_year", "threshold"]
-        else:
-            return ["country_name", "city_name", "year", "threshold"]
+        return self._required_params
     
     def get_parameter_questions(self) -> Dict[str, str]:
         """Get parameter questions based on analysis type"""
-        base_questions = {
-            "country_name": "Which country would you like to analyze? (e.g., South Korea, United States)",
-            "city_name": "Which city would you like to analyze? (e.g., Seoul, Busan, New York)",
-            "threshold": "Please set the sea level rise threshold (e.g., 2.0m, 1.5m)"
-        }
-        
-        if self.analysis_type == "urban_analysis":
-            base_questions.update({
-                "start_year": "Please enter the start year (2001-2020) (e.g., 2014, 2015)",
-                "end_year": "Please enter the end year (2001-2020) (e.g., 2020, 2019)"
-            })
-        else:
-            base_questions["year"] = "What year would you like to analyze? (2001-2020) (e.g., 2020, 2018)"
-        
-        return base_questions
+        return self._parameter_questions
 
 class TopicModelingStrategy(ParameterExtractionStrategy):
     """Strategy for topic modeling analysis"""
     
+    __slots__ = ('_required_params', '_parameter_questions')
+    
+    def __init__(self):
+        self._required_params = ("method", "n_topics")
+        self._parameter_questions = {
+            "method": "Which method would you like to use? (lda, nmf, bertopic)",
+            "n_topics": "How many topics would you like to analyze? (e.g., 10, 15)"
+        }
+    
     async def extract(self, message: str, existing_params: Dict[str, Any]) -> Dict[str, Any]:
         """Extract parameters for topic modeling analysis (no location needed)"""
         extracted = {}
-        message_lower = message.lower()
+        scan_text = message[:MAX_SCAN_LENGTH]
+        kinds = {m.lastgroup for m in _TOPIC_TOKEN_PATTERN.finditer(scan_text)}
         
         # Extract method
-        extracted.update(await self._extract_method(message_lower))
+        if 'method' in kinds:
+            self._extract_method(scan_text, extracted)
         
         # Extract number of topics
-        extracted.update(await self._extract_n_topics(message_lower))
+        if 'number' in kinds:
+            self._extract_n_topics(scan_text, extracted)
         
         return extracted
     
-    async def _extract_method(self, message_lower: str) -> Dict[str, Any]:
-        """Extract topic modeling method"""
-        extracted = {}
-        
-        method_patterns = [
-            r'\b(lda|nmf|bertopic)\b',
-            r'method\s*:?\s*(lda|nmf|bertopic)'
-        ]
-        
-        for pattern in method_patterns:
-            match = re.search(pattern, message_lower)
+    def _extract_method(self, message: str, extracted: Dict[str, Any]) -> None:
+        """Add topic modeling method to extracted"""
+        for pattern in _METHOD_PATTERNS:
+            match = pattern.search(message)
             if match:
-                extracted['method'] = match.group(1)
+                extracted['method'] = match.group(1).lower()
                 break
-        
-        return extracted
     
-    async def _extract_n_topics(self, message_lower: str) -> Dict[str, Any]:
-        """Extract number of topics"""
-        extracted = {}
-        
-        n_topics_patterns = [
-            r'(\d+)\s*(?:topics|topic)',
-            r'n_topics\s*:?\s*(\d+)'
-        ]
-        
-        for pattern in n_topics_patterns:
-            match = re.search(pattern, message_lower)
+    def _extract_n_topics(self, message: str, extracted: Dict[str, Any]) -> None:
+        """Add number of topics to extracted"""
+        for pattern in _N_TOPICS_PATTERNS:
+            match = pattern.search(message)
             if match:
                 n_topics = int(match.group(1))
                 if 2 <= n_topics <= 20:
                     extracted['n_topics'] = n_topics
                     break
-        
-        return extracted
     
-    def get_required_params(self) -> List[str]:
+    def get_required_params(self) -> Tuple[str, ...]:
         """Get required parameters for topic modeling"""
-        return ["method", "n_topics"]
+        return self._required_params
     
     def get_parameter_questions(self) -> Dict[str, str]:
         """Get parameter questions for topic modeling"""
-        return {
-            "method": "Which method would you like to use? (lda, nmf, bertopic)",
-            "n_topics": "How many topics would you like to analyze? (e.g., 10, 15)"
-        }
+        return self._parameter_questions
 
 class ParameterCollector:
     """Main parameter collector using strategy pattern"""
@@ -264,6 +382,18 @@ class ParameterCollector:
             "infrastructure_analysis": LocationBasedStrategy("infrastructure_analysis"),
             "topic_modeling": TopicModelingStrategy(),
         }
+        # Required params never change per analysis type
+        self._required_sets = {
+            analysis_type: frozenset(strategy.get_required_params())
+            for analysis_type, strategy in self.strategies.items()
+        }
+        # Strategy questions layered over the defaults, one table per analysis type
+        self._question_tables = {
+            analysis_type: {**_DEFAULT_QUESTIONS, **strategy.get_parameter_questions()}
+            for analysis_type, strategy in self.strategies.items()
+        }
+        # Extraction results per message and the bits of existing params the strategies read
+        self._extraction_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
     
     async def _extract_parameters(self, message: str, analysis_type: str, existing_params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Extract parameters from user message using appropriate strategy"""
@@ -275,12 +405,27 @@ class ParameterCollector:
         if not strategy:
             raise ValueError(f"No strategy found for analysis type: {analysis_type}")
         
-        # Extract parameters using the strategy
+        # Strategies only look at whether a start year and a full location are already
+        # known, so those two flags plus the message determine the result
+        key = (
+            message, analysis_type, 'start_year' in existing_params,
+            bool(existing_params.get('city_name') and existing_params.get('country_name'))
+        )
+        cached = self._extraction_cache.get(key)
+        if cached is not None:
+            self._extraction_cache.move_to_end(key)
+            return copy.deepcopy(cached)
+        
+        # Extract parameters using the strategy; only the extractors for this analysis
+        # type's required params run (topic modeling never touches location matching)
         extracted = await strategy.extract(message, existing_params)
         
+        self._extraction_cache[key] = copy.deepcopy(extracted)
+        if len(self._extraction_cache) > EXTRACTION_CACHE_SIZE:
+            self._extraction_cache.popitem(last=False)  # Evict least recently used
         return extracted
     
-    def _validate_parameters(self, params: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+    def _validate_parameters(self, params: Dict[str, Any], analysis_type: str) -> "ValidationResult":
         """Validate parameters using strategy's required params"""
         strategy = self.strategies.get(analysis_type)
         if not strategy:
@@ -291,16 +436,15 @@ class ParameterCollector:
         invalid = []
         
         for param in required:
-            if param not in params or params[param] is None:
+            value = params.get(param)
+            if value is None:
                 missing.append(param)
-            elif param == "year" and params[param] not in list(range(2000, 2025)):
-                invalid.append(f"year must be between 2000-2024, got {params[param]}")
-            elif param == "start_year" and params[param] not in list(range(2000, 2025)):
-                invalid.append(f"start_year must be between 2000-2024, got {params[param]}")
-            elif param == "end_year" and params[param] not in list(range(2000, 2025)):
-                invalid.append(f"end_year must be between 2000-2024, got {params[param]}")
-            elif param == "threshold" and not (0.5 <= params[param] <= 5.0):
-                invalid.append(f"threshold must be between 0.5-5.0, got {params[param]}")
+                continue
+            validator = _VALIDATORS.get(param)
+            if validator:
+                error = validator(param, value)
+                if error is not None:
+                    invalid.append(error)
         
         # urban_analysis의 경우 start_year <= end_year 검증
         if analysis_type == "urban_analysis" and "start_year" in params and "end_year" in params:
@@ -314,71 +458,84 @@ class ParameterCollector:
             if 'location_error' in missing:
                 missing.remove('location_error')
 
-        return {
-            "valid": len(missing) == 0 and len(invalid) == 0,
-            "missing": missing,
-            "invalid": invalid,
-            "params": params
-        }
+        return ValidationResult(
+            valid=len(missing) == 0 and len(invalid) == 0,
+            missing=tuple(missing),
+            invalid=tuple(invalid),
+            params=params
+        )
+    
+    def _is_valid_fast(self, params: Dict[str, Any], analysis_type: str) -> bool:
+        """Same verdict as _validate_parameters().valid, stopping at the first failure"""
+        strategy = self.strategies.get(analysis_type)
+        if not strategy:
+            raise ValueError(f"No strategy found for analysis type: {analysis_type}")
+        
+        for param in strategy.get_required_params():
+            value = params.get(param)
+            if value is None:
+                return False
+            validator = _VALIDATORS.get(param)
+            if validator and validator(param, value) is not None:
+                return False
+        
+        if analysis_type == "urban_analysis" and "start_year" in params and "end_year" in params:
+            if params["start_year"] and params["end_year"] and params["start_year"] > params["end_year"]:
+                return False
+        return True
     
     def are_all_parameters_collected(self, params: Dict[str, Any], analysis_type: str) -> bool:
         """Check if all required parameters are collected"""
-        validation = self._validate_parameters(params, analysis_type)
-        return validation["valid"] and len(validation["missing"]) == 0
+        # A missing key already decides the answer without running full validation
+        required = self._required_sets.get(analysis_type)
+        if required is not None and not required <= params.keys():
+            return False
+        
+        # Only a yes/no is needed here; collect_parameters uses _validate_parameters for the details
+        return self._is_valid_fast(params, analysis_type)
 
-    async def collect_parameters(self, message: str, analysis_type: str, existing_params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Main parameter collection method"""
+    @staticmethod
+    def _prune_location_noise(params: Dict[str, Any]):
+        """Drop location errors and suggestions once both city and country are known"""
+        if params.get('city_name') and params.get('country_name'):
+            for key in _LOCATION_NOISE_KEYS:
+                params.pop(key, None)
+    
+    async def collect_parameters(self, message: str, analysis_type: str, existing_params: Dict[str, Any] = None) -> "CollectResult":
+        """Main parameter collection method
+        
+        existing_params is updated in place and returned as result.params;
+        callers replace their stored params with it.
+        """
         if existing_params is None:
             existing_params = {}
         
         # Newly extracted parameters
         extracted = await self._extract_parameters(message, analysis_type, existing_params)
         
-        # Merge with existing parameters
-        all_params = {**existing_params, **extracted}
+        # Merge into existing parameters
+        existing_params.update(extracted)
+        all_params = existing_params
         
-        # Remove location_error if both city_name and country_name are present
-        if ('location_error' in all_params and 
-            'city_name' in all_params and 'country_name' in all_params and
-            all_params['city_name'] and all_params['country_name']):
-            del all_params['location_error']
+        self._prune_location_noise(all_params)
         
         # Validate
         validation = self._validate_parameters(all_params, analysis_type)
         
-        return {
-            "params": all_params,
-            "validation": validation,
-            "needs_more_info": not validation["valid"]
-        }
+        return CollectResult(
+            params=all_params,
+            validation=validation,
+            needs_more_info=not validation.valid
+        )
     
     def generate_questions(self, missing_params: List[str], analysis_type: str) -> str:
         """Generate questions for missing parameters using strategy"""
-        strategy = self.strategies.get(analysis_type)
-        if not strategy:
+        questions = self._question_tables.get(analysis_type)
+        if questions is None:
             return "Additional information is needed."
         
-        questions = strategy.get_parameter_questions()
-        
-        if missing_params:
-            missing_param = missing_params[0]
-            if missing_param in questions:
-                return questions[missing_param]
-        
-        # Default questions
-        default_questions = {
-            "year": "What year would you like to analyze? (2001-2020) (e.g., 2020, 2018)",
-            "start_year": "Please enter the start year (2001-2020) (e.g., 2014, 2015)",
-            "end_year": "Please enter the end year (2001-2020) (e.g., 2020, 2019)",
-            "threshold": "Please set the sea level rise threshold (e.g., 1.0m, 2.5m)",
-            "city_name": "Which city would you like to analyze? (e.g., Seoul, Busan, New York)",
-            "country_name": "Which country would you like to analyze? (e.g., South Korea, United States)",
-            "method": "Please select the topic modeling method (lda, nmf, bertopic)",
-            "n_topics": "How many topics would you like to analyze? (e.g., 5, 10)"
-        }
-        
         if missing_params:
-            return default_questions.get(missing_params[0], f"Please provide {missing_params[0]} information.")
+            return questions.get(missing_params[0], f"Please provide {missing_params[0]} information.")
         return "Additional information is needed."
 
 # Create global instance
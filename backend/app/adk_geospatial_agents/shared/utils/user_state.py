@@ -0,0 +1,49 @@
+"""
+Per-user conversation state
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Any, Optional
+
+# Only the most recent turns are kept in memory; older ones live in the messages table
+CONVERSATION_CONTEXT_MAXLEN = int(os.getenv("CONVERSATION_CONTEXT_MAXLEN", "50"))
+
+# States of users idle for longer than this are dropped
+USER_STATE_IDLE_SECONDS = 3600
+USER_STATE_EVICT_INTERVAL = 300
+
+@dataclass(slots=True)
+class UserState:
+    """Conversation state for a single user"""
+    status: str = "idle"  # idle, collecting_parameters, awaiting_confirmation, analysis_in_progress
+    analysis_type: Optional[str] = None
+    collected_params: Dict[str, Any] = field(default_factory=dict)
+    conversation_context: Deque[Dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=CONVERSATION_CONTEXT_MAXLEN)
+    )
+    last_reset_time: Optional[float] = None
+    last_seen: float = field(default_factory=time.monotonic)
+
+# Process-local states keyed by user_id. They aren't durable, so they are kept out
+# of the ADK session state and its serialization
+_USER_STATES: Dict[int, UserState] = {}
+
+def get_user_state(user_id: int) -> UserState:
+    """Get the user's state, creating it on first use, and mark the user as active"""
+    user_state = _USER_STATES.get(user_id)
+    if user_state is None:
+        user_state = _USER_STATES[user_id] = UserState()
+    user_state.last_seen = time.monotonic()
+    return user_state
+
+async def evict_idle_users():
+    """Periodically drop the states of idle users (runs for the app's lifetime)"""
+    while True:
+        await asyncio.sleep(USER_STATE_EVICT_INTERVAL)
+        cutoff = time.monotonic() - USER_STATE_IDLE_SECONDS
+        for user_id in [uid for uid, state in _USER_STATES.items() if state.last_seen < cutoff]:
+            del _USER_STATES[user_id]
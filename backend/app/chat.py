@@ -97,6 +97,19 @@ async def send_message_endpoint(chat_id: int, content: str, current_user: models
         
         print(f"✅ [ADK] Agent response: '{response.get('message', 'No response')[:50]}...'")
         
+        if response.get("deduped"):
+            # Same message was already in flight; its request stores the reply, so drop
+            # this duplicate user message and return the shared reply unsaved
+            db.delete(user_msg)
+            db.commit()
+            return {
+                "id": 0,
+                "sender": "assistant",
+                "content": response.get("message", "Sorry, I cannot generate a response."),
+                "created_at": datetime.utcnow().isoformat(),
+                "dashboard_updates": []
+            }
+        
         # Store AI response
         ai_msg = models.Message(
             chat_id=chat_id, 
@@ -1,5 +1,9 @@
 from dotenv import load_dotenv
 import os
+import queue
+import asyncio
+import logging
+from logging.handlers import QueueHandler, QueueListener
 
 # Load environment variables first
 load_dotenv()
@@ -8,6 +12,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from . import auth, chat, file_upload, analysis, location
+from .adk_geospatial_agents.main_agent.agent import close_http_client
+from .adk_geospatial_agents.shared.utils.parameter_collector import shutdown_executor
+from .adk_geospatial_agents.shared.utils.user_state import evict_idle_users
 
 app = FastAPI()
 
@@ -25,6 +32,34 @@ app.include_router(file_upload.router, prefix="/files", tags=["files"])
 app.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
 app.include_router(location.router, prefix="/location", tags=["location"])
 
+# Application logs are handed to a queue and written by a listener thread,
+# so request handlers never block on stream I/O
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+
+# Background task dropping in-memory states of idle chat users
+eviction_task = None
+
+@app.on_event("startup")
+async def startup():
+    """Configure queued logging and start background tasks"""
+    global eviction_task
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
+    log_listener.start()
+    eviction_task = asyncio.create_task(evict_idle_users())
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release shared resources held by the ADK agents"""
+    if eviction_task is not None:
+        eviction_task.cancel()
+    await close_http_client()
+    shutdown_executor()
+    log_listener.stop()
+
 @app.get("/")
 def root():
     return {"message": "DataGround AI Assistant with Google ADK Multi-Agent System running"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -21,6 +21,11 @@ class Chat(Base):
     user = relationship('User', back_populates='chats')
     messages = relationship('Message', back_populates='chat')
 
+    # A user's chats, newest first
+    __table_args__ = (
+        Index('ix_chats_user_created', user_id, created_at.desc()),
+    )
+
 class Message(Base):
     __tablename__ = 'messages'
     id = Column(Integer, primary_key=True, index=True)
@@ -29,3 +34,8 @@ class Message(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     chat = relationship('Chat', back_populates='messages')
+
+    # A chat's messages by time, optionally narrowed to one sender
+    __table_args__ = (
+        Index('ix_messages_chat_sender_created', 'chat_id', 'sender', 'created_at'),
+    )
@@ -0,0 +1,206 @@
+"""
+Duplicate request coalescing and Redis dedupe tests for adk_chat
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import adk_chat
+
+RESPONSE = {
+    "message": "Sea level rise analysis started",
+    "status": "success",
+    "dashboard_updated": True,
+    "dashboard_updates": [{"type": "analysis_triggered", "auto_execute": True}],
+    "redirect_to_manual": True
+}
+
+class FakeRedisError(Exception):
+    """Stands in for redis.exceptions.RedisError"""
+
+class FakeRedis:
+    """In-memory stand-in for the few redis.asyncio calls the dedupe path makes"""
+
+    def __init__(self, failing=()):
+        self.data = {}
+        self.failing = set(failing)
+
+    def _check(self, name):
+        if name in self.failing:
+            raise FakeRedisError(f"{name} failed")
+
+    async def set(self, key, value, nx=False, ex=None):
+        self._check("set")
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        self._check("get")
+        return self.data.get(key)
+
+    async def exists(self, key):
+        self._check("exists")
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        self._check("eval")
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+class CoalescedReplyTest(unittest.TestCase):
+    def test_keeps_status_and_drops_side_effects(self):
+        reply = adk_chat._coalesced_reply(RESPONSE)
+
+        self.assertEqual(reply["status"], "success")
+        self.assertEqual(reply["message"], RESPONSE["message"])
+        self.assertTrue(reply["deduped"])
+        self.assertEqual(reply["dashboard_updates"], [])
+        self.assertFalse(reply["dashboard_updated"])
+        self.assertFalse(reply["redirect_to_manual"])
+        # The original response is left untouched
+        self.assertEqual(len(RESPONSE["dashboard_updates"]), 1)
+
+class InflightCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_requests_share_one_run(self):
+        calls = []
+        release = asyncio.Event()
+
+        async def process(message, user_id, db, chat_id):
+            calls.append(message)
+            await release.wait()
+            return dict(RESPONSE)
+
+        with mock.patch.object(adk_chat, "redis_client", None), \
+                mock.patch.object(adk_chat, "_process_message", process):
+            first = asyncio.create_task(adk_chat.send_message("analyze Seoul", 1, None, 7))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(adk_chat.send_message("analyze Seoul", 1, None, 7))
+            await asyncio.sleep(0)
+            release.set()
+            original, duplicate = await asyncio.gather(first, second)
+
+        self.assertEqual(calls, ["analyze Seoul"])
+        self.assertNotIn("deduped", original)
+        self.assertTrue(duplicate["deduped"])
+        self.assertEqual(duplicate["status"], "success")
+        self.assertEqual(duplicate["dashboard_updates"], [])
+        self.assertEqual(adk_chat._inflight_requests, {})
+
+    async def test_different_chats_are_not_coalesced(self):
+        async def process(message, user_id, db, chat_id):
+            await asyncio.sleep(0)
+            return dict(RESPONSE)
+
+        with mock.patch.object(adk_chat, "redis_client", None), \
+                mock.patch.object(adk_chat, "_process_message", process):
+            replies = await asyncio.gather(
+                adk_chat.send_message("analyze Seoul", 1, None, 7),
+                adk_chat.send_message("analyze Seoul", 1, None, 8)
+            )
+
+        self.assertTrue(all("deduped" not in reply for reply in replies))
+
+class SharedDedupeTest(unittest.IsolatedAsyncioTestCase):
+    def patch_redis(self, redis, process):
+        stack = contextlib.ExitStack()
+        stack.enter_context(mock.patch.object(adk_chat, "redis_client", redis))
+        stack.enter_context(mock.patch.object(adk_chat, "_REDIS_ERRORS", (FakeRedisError,)))
+        stack.enter_context(mock.patch.object(adk_chat, "_process_message", process))
+        stack.enter_context(mock.patch.object(adk_chat, "DEDUPE_POLL_INTERVAL", 0.01))
+        return stack
+
+    async def test_waiter_ignores_result_of_an_earlier_lock_holder(self):
+        redis = FakeRedis()
+        # A finished identical request left its result behind; another worker now holds the lock
+        redis.data["dedupe_result:abc:old"] = json.dumps({"message": "stale", "status": "success"})
+        redis.data["dedupe:abc"] = "current"
+
+        async def publish():
+            await asyncio.sleep(0.05)
+            redis.data["dedupe_result:abc:current"] = json.dumps({"message": "fresh", "status": "success"})
+            del redis.data["dedupe:abc"]
+
+        async def process(message, user_id, db, chat_id):
+            raise AssertionError("the lock holder's result should be reused")
+
+        with self.patch_redis(redis, process):
+            publisher = asyncio.create_task(publish())
+            reply = await adk_chat._process_message_shared("abc", "analyze Seoul", 1, None, 7)
+            await publisher
+
+        self.assertEqual(reply["message"], "fresh")
+        self.assertTrue(reply["deduped"])
+
+    async def test_holder_publishes_under_its_token_and_releases_the_lock(self):
+        redis = FakeRedis()
+
+        async def process(message, user_id, db, chat_id):
+            return dict(RESPONSE)
+
+        with self.patch_redis(redis, process):
+            reply = await adk_chat._process_message_shared("abc", "analyze Seoul", 1, None, 7)
+
+        self.assertEqual(reply, RESPONSE)
+        self.assertNotIn("dedupe:abc", redis.data)
+        result_keys = [key for key in redis.data if key.startswith("dedupe_result:abc:")]
+        self.assertEqual(len(result_keys), 1)
+        self.assertEqual(json.loads(redis.data[result_keys[0]])["message"], RESPONSE["message"])
+
+    async def test_unreachable_redis_falls_back_to_local_processing(self):
+        redis = FakeRedis(failing={"set", "get", "exists", "eval"})
+
+        async def process(message, user_id, db, chat_id):
+            return dict(RESPONSE)
+
+        with self.patch_redis(redis, process):
+            reply = await adk_chat.send_message("analyze Seoul", 1, None, 7)
+
+        self.assertEqual(reply, RESPONSE)
+
+    async def test_publish_and_release_failures_keep_the_reply(self):
+        redis = FakeRedis()
+
+        async def process(message, user_id, db, chat_id):
+            # Redis goes away while the agent is running
+            redis.failing.update({"set", "eval"})
+            return dict(RESPONSE)
+
+        with self.patch_redis(redis, process):
+            reply = await adk_chat._process_message_shared("abc", "analyze Seoul", 1, None, 7)
+
+        self.assertEqual(reply, RESPONSE)
+
+    async def test_waiter_processes_itself_when_holder_publishes_nothing(self):
+        redis = FakeRedis()
+        redis.data["dedupe:abc"] = "current"
+        calls = []
+
+        async def fail_holder():
+            await asyncio.sleep(0.05)
+            del redis.data["dedupe:abc"]
+
+        async def process(message, user_id, db, chat_id):
+            calls.append(message)
+            return dict(RESPONSE)
+
+        with self.patch_redis(redis, process):
+            holder = asyncio.create_task(fail_holder())
+            reply = await adk_chat._process_message_shared("abc", "analyze Seoul", 1, None, 7)
+            await holder
+
+        self.assertEqual(calls, ["analyze Seoul"])
+        self.assertEqual(reply, RESPONSE)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+Slash command parsing tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.adk_geospatial_agents.shared.utils.command_system import CommandParser, ResetType
+
+class CommandParserTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = CommandParser()
+
+    def test_command_with_args(self):
+        command = self.parser.parse_command("/reset now")
+
+        self.assertIsNotNone(command)
+        self.assertEqual(command.type, ResetType.FULL_RESET)
+        self.assertEqual(command.args, "now")
+
+    def test_bare_command_is_case_and_whitespace_insensitive(self):
+        command = self.parser.parse_command("  /RESET  ")
+
+        self.assertEqual(command.type, ResetType.FULL_RESET)
+        self.assertEqual(command.args, "")
+
+    def test_command_must_end_at_a_word_boundary(self):
+        self.assertIsNone(self.parser.parse_command("/resetting"))
+
+    def test_plain_messages_are_not_commands(self):
+        self.assertIsNone(self.parser.parse_command("please reset the chat"))
+        self.assertIsNone(self.parser.parse_command(""))
+        self.assertIsNone(self.parser.parse_command("/unknown"))
+
+if __name__ == "__main__":
+    unittest.main()
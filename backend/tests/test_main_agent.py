@@ -0,0 +1,121 @@
+"""
+Main agent tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.adk_geospatial_agents.main_agent import agent
+
+def classify(message):
+    """Confirmation verdict in handle_confirmation's order: positive wins over negative"""
+    if agent.POSITIVE_RESPONSE_RE.search(message):
+        return "yes"
+    if agent.NEGATIVE_RESPONSE_RE.search(message):
+        return "no"
+    return "unclear"
+
+class ConfirmationReplyTest(unittest.TestCase):
+    def test_positive_replies(self):
+        for message in ("yes", "Y", "OK, go ahead", "okay!", "네요", "맞아요", "좋아"):
+            with self.subTest(message=message):
+                self.assertEqual(classify(message), "yes")
+
+    def test_negative_replies(self):
+        for message in ("no", "N", "no, wrong city", "아니요", "다시 할게요", "취소"):
+            with self.subTest(message=message):
+                self.assertEqual(classify(message), "no")
+
+    def test_single_letters_only_match_as_words(self):
+        # "y" in "city" and "n" in "Incheon" are not answers
+        for message in ("city", "Incheon please", "maybe later"):
+            with self.subTest(message=message):
+                self.assertEqual(classify(message), "unclear")
+
+def response(status_code, method="GET", endpoint="/analysis/test"):
+    return httpx.Response(status_code, request=httpx.Request(method, "http://testserver" + endpoint))
+
+class RequestWithBreakerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = mock.Mock()
+        self.client.request = mock.AsyncMock()
+        for patcher in (
+            mock.patch.object(agent, "get_http_client", return_value=self.client),
+            mock.patch.object(agent, "API_BACKOFF_BASE", 0),
+            mock.patch.dict(agent._breaker_states, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_get_retries_server_errors(self):
+        self.client.request.side_effect = [response(503), response(502), response(200)]
+
+        result = await agent._request_with_breaker("GET", "/analysis/test")
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(self.client.request.await_count, 3)
+        self.assertEqual(agent._breaker_states["/analysis/test"]["fail_count"], 0)
+
+    async def test_get_retries_transport_errors(self):
+        self.client.request.side_effect = [httpx.ConnectError("refused"), response(200)]
+
+        result = await agent._request_with_breaker("GET", "/analysis/test")
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(self.client.request.await_count, 2)
+
+    async def test_post_is_sent_once(self):
+        self.client.request.side_effect = [response(500, "POST")]
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await agent._request_with_breaker("POST", "/analysis/test")
+
+        self.assertEqual(self.client.request.await_count, 1)
+
+    async def test_client_error_raises_without_counting(self):
+        self.client.request.side_effect = [response(404)]
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await agent._request_with_breaker("GET", "/analysis/test")
+
+        self.assertEqual(self.client.request.await_count, 1)
+        self.assertEqual(agent._breaker_states["/analysis/test"]["fail_count"], 0)
+
+    async def test_attempts_stop_at_the_deadline(self):
+        self.client.request.side_effect = lambda *args, **kwargs: response(500)
+
+        with mock.patch.object(agent, "API_BACKOFF_BASE", 0.1), \
+                mock.patch.object(agent, "API_RETRY_DEADLINE", 0.15):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await agent._request_with_breaker("GET", "/analysis/test")
+
+        # The second backoff (0.2s) would run past the deadline
+        self.assertEqual(self.client.request.await_count, 2)
+        for call in self.client.request.await_args_list:
+            self.assertLessEqual(call.kwargs["timeout"], 0.15)
+
+    async def test_breaker_opens_after_repeated_failures(self):
+        self.client.request.side_effect = lambda *args, **kwargs: response(500)
+
+        for _ in range(agent.BREAKER_FAIL_THRESHOLD):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await agent._request_with_breaker("GET", "/analysis/test")
+        calls = self.client.request.await_count
+
+        with self.assertRaises(agent.ServiceUnavailableError):
+            await agent._request_with_breaker("GET", "/analysis/test")
+        self.assertEqual(self.client.request.await_count, calls)
+
+        # Other endpoints keep their own breaker
+        self.client.request.side_effect = [response(200)]
+        result = await agent._request_with_breaker("GET", "/analysis/other")
+        self.assertEqual(result.status_code, 200)
+
+if __name__ == "__main__":
+    unittest.main()
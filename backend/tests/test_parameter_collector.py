@@ -0,0 +1,93 @@
+"""
+Parameter collector tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.adk_geospatial_agents.shared.utils.parameter_collector import (
+    CollectResult,
+    ParameterCollector,
+    ValidationResult,
+)
+
+class PruneLocationNoiseTest(unittest.TestCase):
+    def test_noise_dropped_once_location_is_known(self):
+        params = {
+            "city_name": "Seoul",
+            "country_name": "South Korea",
+            "location_error": "City not found",
+            "suggestion_message": "Did you mean Seoul?",
+            "suggested_city": "Seoul",
+            "suggested_country": "South Korea",
+            "year": 2020
+        }
+
+        ParameterCollector._prune_location_noise(params)
+
+        self.assertEqual(params, {"city_name": "Seoul", "country_name": "South Korea", "year": 2020})
+
+    def test_noise_kept_while_location_is_incomplete(self):
+        params = {"city_name": "Seoul", "location_error": "Country not found", "suggested_country": "South Korea"}
+
+        ParameterCollector._prune_location_noise(params)
+
+        self.assertIn("location_error", params)
+        self.assertIn("suggested_country", params)
+
+class CollectResultTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.collector = ParameterCollector()
+
+    async def test_complete_parameters(self):
+        result = await self.collector.collect_parameters("Use lda with 5 topics", "topic_modeling")
+
+        self.assertIsInstance(result, CollectResult)
+        self.assertIsInstance(result.validation, ValidationResult)
+        self.assertFalse(result.needs_more_info)
+        self.assertEqual(result.params, {"method": "lda", "n_topics": 5})
+        self.assertTrue(result.validation.valid)
+        self.assertEqual(result.validation.missing, ())
+        # Callers written against the old dicts still index by field name
+        self.assertIs(result["params"], result.params)
+        self.assertEqual(result["validation"]["missing"], ())
+
+    async def test_missing_parameters(self):
+        existing = {}
+        result = await self.collector.collect_parameters("Use nmf", "topic_modeling", existing)
+
+        self.assertTrue(result.needs_more_info)
+        self.assertEqual(result.validation.missing, ("n_topics",))
+        self.assertFalse(result.validation.valid)
+        # existing_params is updated in place and handed back
+        self.assertIs(result.params, existing)
+        self.assertEqual(existing, {"method": "nmf"})
+
+class AreAllParametersCollectedTest(unittest.TestCase):
+    def setUp(self):
+        self.collector = ParameterCollector()
+
+    def test_matches_full_validation(self):
+        self.assertTrue(self.collector.are_all_parameters_collected({"method": "lda", "n_topics": 5}, "topic_modeling"))
+        self.assertFalse(self.collector.are_all_parameters_collected({"method": "lda"}, "topic_modeling"))
+        self.assertFalse(self.collector.are_all_parameters_collected(
+            {"country_name": "South Korea", "city_name": "Seoul", "year": 1990, "threshold": 1.0},
+            "sea_level_rise"
+        ))
+        # The early-exit check gives the same verdict as full validation
+        for params, analysis_type in (
+            ({"method": "lda", "n_topics": 5}, "topic_modeling"),
+            ({"country_name": "South Korea", "city_name": "Seoul", "start_year": 2020, "end_year": 2015, "threshold": 1.0}, "urban_analysis"),
+            ({"country_name": "South Korea", "city_name": "Seoul", "year": 2020, "threshold": 9.0}, "sea_level_rise"),
+            ({"country_name": "South Korea", "city_name": "Seoul", "year": 2020, "threshold": 1.0}, "sea_level_rise"),
+        ):
+            self.assertEqual(
+                self.collector.are_all_parameters_collected(params, analysis_type),
+                self.collector._validate_parameters(params, analysis_type).valid
+            )
+
+if __name__ == "__main__":
+    unittest.main()